@@ -0,0 +1,94 @@
+"""
+Synthetic features and step handlers for the benchmarks. Everything is
+generated from a fixed seed, so every run measures the same work.
+"""
+
+import random
+import re
+
+from swanson.handlers import Matcher, StepHandler
+
+WORDS = (
+    'account', 'admin', 'apple', 'basket', 'button', 'checkout', 'customer',
+    'email', 'invoice', 'item', 'list', 'message', 'order', 'page', 'password',
+    'payment', 'product', 'report', 'search', 'setting', 'team', 'user'
+)
+
+CLAUSES = ('Given', 'When', 'Then')
+
+def get_random(seed=0):
+    return random.Random(seed)
+
+def get_word(index):
+    return WORDS[index % len(WORDS)]
+
+def generate_step_title(rng, index):
+    # Matched by the handler generate_handlers() creates for `index`.
+    return 'the {} {} has {} {}s'.format(
+        get_word(index),
+        index,
+        rng.randint(1, 100),
+        rng.choice(WORDS)
+    )
+
+def generate_feature(rng, index, scenario_count=10, step_count=5, handler_count=50):
+    lines = [
+        'Feature: Feature {}'.format(index),
+        '    As a {}'.format(rng.choice(WORDS)),
+        '    I want to use the {}'.format(rng.choice(WORDS)),
+        '',
+        '    Background:',
+        '        Given a {} named "{}"'.format(rng.choice(WORDS), rng.choice(WORDS)),
+    ]
+
+    for scenario_index in range(scenario_count):
+        lines.extend(['', '    Scenario: Scenario {} of feature {}'.format(scenario_index, index)])
+        for step_index in range(step_count):
+            lines.append('        {} {}'.format(
+                CLAUSES[min(step_index, len(CLAUSES) - 1)],
+                generate_step_title(rng, rng.randrange(handler_count))
+            ))
+
+    return '\n'.join(lines) + '\n'
+
+def generate_outline_feature(rng, row_count, column_count=5):
+    columns = ['column{}'.format(index) for index in range(column_count)]
+
+    lines = [
+        'Feature: Large outline',
+        '',
+        '    Scenario Outline: Every row',
+    ]
+    for clause, column in zip(CLAUSES * column_count, columns):
+        lines.append('        {} the {} is <{}>'.format(clause, rng.choice(WORDS), column))
+
+    lines.extend(['', '        Examples:', '            | {} |'.format(' | '.join(columns))])
+    for _ in range(row_count):
+        lines.append('            | {} |'.format(' | '.join(
+            '{}{}'.format(rng.choice(WORDS), rng.randint(0, 1000))
+            for _ in columns
+        )))
+
+    return '\n'.join(lines) + '\n'
+
+def generate_handlers(count):
+    """
+    Step handlers in the shapes real suites use: mostly anchored patterns
+    with a literal prefix, some case-insensitive, some unanchored.
+    """
+
+    handlers = []
+    for index in range(count):
+        pattern = r'^the {} {} has (\d+) (\w+)s$'.format(get_word(index), index)
+        kind = index % 10
+        if kind == 0:
+            pattern = '(?i){}'.format(pattern)
+        elif kind == 1:
+            pattern = pattern[1:]
+
+        handlers.append(StepHandler(
+            matchers=(Matcher(regex=re.compile(pattern), clause=None),),
+            func=None
+        ))
+
+    return handlers
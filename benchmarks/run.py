@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""
+Benchmarks for feature parsing, code generation, step matching and outline
+expansion.
+
+    python benchmarks/run.py --save baseline.json
+    # ...make changes...
+    python benchmarks/run.py --compare baseline.json
+
+Timings depend on the machine, so only compare against a baseline recorded on
+the same one. Exits with status 1 if any benchmark is slower than the
+baseline by more than --threshold.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os.path
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import corpus
+from swanson.codegen import CodeGen
+from swanson.data import Feature
+from swanson.handlers import StepHandlers
+
+BENCHMARKS = []
+
+def benchmark(name, number=1):
+    """
+    Register a benchmark. The decorated function does any setup, and returns
+    the function to time.
+    """
+
+    def register(setup):
+        BENCHMARKS.append((name, number, setup))
+        return setup
+    return register
+
+def add_parse_benchmark(feature_count):
+    @benchmark('parse_{}_features'.format(feature_count))
+    def setup():
+        rng = corpus.get_random()
+        strings = [corpus.generate_feature(rng, index) for index in range(feature_count)]
+
+        def run():
+            for string in strings:
+                Feature.from_string(string)
+        return run
+
+def add_codegen_benchmark(feature_count):
+    @benchmark('codegen_{}_features'.format(feature_count))
+    def setup():
+        rng = corpus.get_random()
+        features = [Feature.from_string(corpus.generate_feature(rng, index)) for index in range(feature_count)]
+
+        def run():
+            for feature in features:
+                CodeGen.generate_test_module(feature)
+        return run
+
+def add_match_benchmark(handler_count, step_count=1000):
+    @benchmark('match_{}_steps_{}_handlers'.format(step_count, handler_count))
+    def setup():
+        rng = corpus.get_random()
+        handlers = corpus.generate_handlers(handler_count)
+        feature = Feature.from_string(corpus.generate_feature(
+            rng, 0, scenario_count=step_count // 10, step_count=10, handler_count=handler_count
+        ))
+        steps = [step for scenario in feature.scenarios for step in scenario.steps]
+
+        def run():
+            # A fresh StepHandlers each time, so nothing is memoised yet.
+            step_handlers = StepHandlers(handlers)
+            for step in steps:
+                step_handlers.get_handler_match_for_step(step)
+        return run
+
+def add_outline_benchmark(row_count):
+    @benchmark('expand_outline_{}_rows'.format(row_count))
+    def setup():
+        feature = Feature.from_string(corpus.generate_outline_feature(corpus.get_random(), row_count))
+        outline = feature.scenarios[0]
+
+        def run():
+            for scenario in outline.expand_examples():
+                for step in scenario.steps:
+                    step.title
+        return run
+
+for feature_count in (100, 1000):
+    add_parse_benchmark(feature_count)
+for feature_count in (100, 1000):
+    add_codegen_benchmark(feature_count)
+for handler_count in (10, 100, 1000):
+    add_match_benchmark(handler_count)
+for row_count in (100, 10000):
+    add_outline_benchmark(row_count)
+
+def run_benchmarks(pattern=None, repeat=5):
+    results = {}
+    for name, number, setup in BENCHMARKS:
+        if pattern and not re.search(pattern, name):
+            continue
+
+        func = setup()
+        # The best of several runs is the least affected by other processes.
+        results[name] = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+        print('{:40} {:10.4f}s'.format(name, results[name]))
+        sys.stdout.flush()
+
+    return results
+
+def compare(results, baseline, threshold):
+    print('\n{:40} {:>10} {:>10} {:>8}'.format('', 'baseline', 'current', 'ratio'))
+
+    regressions = []
+    for name, duration in sorted(results.items()):
+        if name not in baseline:
+            continue
+
+        ratio = duration / baseline[name]
+        print('{:40} {:9.4f}s {:9.4f}s {:7.2f}x{}'.format(
+            name,
+            baseline[name],
+            duration,
+            ratio,
+            '  SLOWER' if ratio > threshold else ''
+        ))
+        if ratio > threshold:
+            regressions.append(name)
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', dest='pattern', help='Only run benchmarks matching this regex.')
+    parser.add_argument('--repeat', type=int, default=5, help='Times to run each benchmark.')
+    parser.add_argument('--save', metavar='FILENAME', help='Save the results as a baseline.')
+    parser.add_argument('--compare', metavar='FILENAME', help='Compare the results with a saved baseline.')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Slowdown, as a ratio to the baseline, that counts as a regression.')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.pattern, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print('\n{} benchmark(s) slower than the baseline'.format(len(regressions)))
+            return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -23,6 +23,9 @@ setup(
         'pydentifier',
         'six'
     ],
+    extras_require={
+        'pyinstrument': ['pyinstrument']
+    },
     test_suite='tests',
     tests_require=[
         'django'
@@ -1,2 +1,4 @@
 from swanson.decorators import step, given, when, then
 from swanson.test.case import TestCaseMixin, SimpleTestCase, TransactionTestCase, TestCase, LiveServerTestCase
+
+default_app_config = 'swanson.apps.SwansonConfig'
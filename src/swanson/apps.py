@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class SwansonConfig(AppConfig):
+    name = 'swanson'
+
+    def ready(self):
+        from swanson.test import journal, profiling
+        journal.connect()
+        profiling.connect()
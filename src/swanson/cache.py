@@ -0,0 +1,87 @@
+import collections
+import os
+import os.path
+import threading
+import timeit
+
+from swanson.data import Feature
+from swanson.handlers import CacheInfo
+from swanson.signals import post_feature_parse
+
+class FeatureCache(object):
+    def __init__(self, max_size=128, cache_dir=None):
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._features = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, filename):
+        filename = os.path.abspath(filename)
+        stat_key = get_stat_key(filename)
+
+        feature = self.lookup(filename, stat_key)
+        if feature is None:
+            feature = self.load(filename)
+            self.add(filename, stat_key, feature)
+
+        return feature
+
+    def lookup(self, filename, stat_key):
+        with self._lock:
+            cached = self._features.pop(filename, None)
+            if cached is not None and cached[0] == stat_key:
+                # Re-insert to mark as most recently used.
+                self._features[filename] = cached
+                self.hits += 1
+                return cached[1]
+
+            self.misses += 1
+            return None
+
+    def add(self, filename, stat_key, feature):
+        if self.max_size == 0:
+            return
+
+        with self._lock:
+            self._features.pop(filename, None)
+            self._features[filename] = (stat_key, feature)
+            if self.max_size is not None:
+                while len(self._features) > self.max_size:
+                    self._features.popitem(last=False)
+
+    def load(self, filename):
+        start_time = timeit.default_timer()
+        feature = Feature.from_filename(filename, cache_dir=self.cache_dir)
+        post_feature_parse.send(
+            sender=self,
+            filename=filename,
+            duration=timeit.default_timer() - start_time
+        )
+        return feature
+
+    def clear(self):
+        with self._lock:
+            self._features.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.max_size, len(self._features))
+
+def get_stat_key(filename):
+    stat = os.stat(filename)
+    return (stat.st_mtime, stat.st_size)
+
+_feature_cache = None
+
+def get_feature_cache():
+    global _feature_cache
+    if _feature_cache is None:
+        from swanson import settings
+        _feature_cache = FeatureCache(settings.FEATURE_CACHE_SIZE, settings.FEATURE_CACHE_DIR)
+    return _feature_cache
+
+def get_feature(filename):
+    return get_feature_cache().get(filename)
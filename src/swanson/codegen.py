@@ -4,12 +4,43 @@ import re
 import pydentifier
 import six
 
+from swanson.module_source import get_test_case_source
+
 class InvalidParameters(Exception):
     pass
 
 class DuplicateScenarioTitles(Exception):
     pass
 
+# Characters a step title may contain that are special in a regex. The same
+# as `([[\^$.|?*+()])`, without the ambiguous nested set.
+REGEX_SPECIAL_CHARS_REGEX = re.compile(r'([\[\^$.|?*+()])')
+
+class RawStringEscapes(dict):
+    """
+    How each character is written in a raw string literal, keyed by ordinal
+    for `unicode.translate`, and worked out the first time it's seen.
+    """
+
+    def __init__(self, quote):
+        super(RawStringEscapes, self).__init__()
+        self.quote = quote
+
+    def __missing__(self, ordinal):
+        char = six.unichr(ordinal)
+        if char == self.quote:
+            escaped = '\\{}'.format(self.quote)
+        elif char == '\\':
+            escaped = '\\'
+        else:
+            # Python 2 prefixes the repr with `u`.
+            escaped = repr(char).lstrip('u')[1:-1]
+        escaped = self[ordinal] = six.text_type(escaped)
+        return escaped
+
+_raw_string_escapes = {}
+_function_params = {}
+
 class CodeGen(object):
     InvalidParameters = InvalidParameters
     DuplicateScenarioTitles = DuplicateScenarioTitles
@@ -23,6 +54,46 @@ class CodeGen(object):
             )))
         )
 
+    @classmethod
+    def merge_test_module(cls, feature, source):
+        """
+        Add test methods and step handlers for the scenarios and steps that
+        the test case in `source` doesn't handle yet. Returns the new source,
+        or None if there's nothing to add.
+        """
+
+        test_case = get_test_case_source(source, cls.get_test_case_name(feature))
+        if test_case is None:
+            return None
+
+        member_identifiers = UniqueIdentifiers(test_case.member_names)
+
+        # Nothing is added unless it's certain to be missing.
+        members = '\n\n'.join(filter(None, (
+            None if test_case.has_unknown_scenarios else cls.generate_test_case_functions(feature, member_identifiers, [
+                scenario
+                for scenario in feature.scenarios
+                if scenario.title not in test_case.scenario_titles
+            ]),
+            None if test_case.has_unknown_handlers else cls.generate_step_handlers(
+                test_case.get_missing_steps(cls.iter_feature_steps(feature)),
+                member_identifiers
+            )
+        )))
+        if not members:
+            return None
+
+        lines = source.splitlines(True)
+        before = lines[:test_case.end_line]
+        if before and not before[-1].endswith('\n'):
+            before[-1] += '\n'
+
+        return ''.join(before + [
+            '\n',
+            cls.indent(members, test_case.indent),
+            '\n'
+        ] + lines[test_case.end_line:])
+
     @classmethod
     def generate_test_module_header(cls, feature):
         return 'from swanson import TestCase, step, given, when, then'
@@ -60,14 +131,16 @@ class CodeGen(object):
         return '"""\n{}\n"""'.format(feature.title)
 
     @classmethod
-    def generate_test_case_functions(cls, feature, member_identifiers=None):
+    def generate_test_case_functions(cls, feature, member_identifiers=None, scenarios=None):
         if member_identifiers is None:
             member_identifiers = UniqueIdentifiers()
+        if scenarios is None:
+            scenarios = feature.scenarios
 
         seen_scenario_titles = set()
 
         functions = []
-        for scenario in feature.scenarios:
+        for scenario in scenarios:
             if scenario.title not in seen_scenario_titles:
                 seen_scenario_titles.add(scenario.title)
             else:
@@ -177,18 +250,16 @@ class CodeGen(object):
 
     @classmethod
     def generate_raw_string(cls, string, quote="'"):
-        chars = []
-        for char in string:
-            if char == quote:
-                chars.append('\\{}'.format(quote))
-            elif char == '\\':
-                chars.append('\\')
-            else:
-                chars.append(repr(char)[1:-1])
+        try:
+            escapes = _raw_string_escapes[quote]
+        except KeyError:
+            escapes = _raw_string_escapes[quote] = RawStringEscapes(quote)
 
         return 'r{}{}{}'.format(
             quote,
-            ''.join(chars),
+            # Only text can be translated with a mapping, and on Python 2
+            # ASCII step patterns are byte strings.
+            six.text_type(string).translate(escapes),
             quote
         )
 
@@ -215,11 +286,7 @@ class CodeGen(object):
 
     @classmethod
     def escape_regex(cls, string):
-        return re.sub(
-            '([[\\^$.|?*+()])',
-            r'\1',
-            string
-        )
+        return REGEX_SPECIAL_CHARS_REGEX.sub(r'\1', string)
 
     @classmethod
     def generate_function(cls, name, params, body):
@@ -231,6 +298,13 @@ class CodeGen(object):
 
     @classmethod
     def generate_function_params(cls, params):
+        # Most functions have the same parameters, so are only checked once.
+        params = tuple(params)
+        try:
+            return _function_params[params]
+        except KeyError:
+            pass
+
         seen_params = set()
         for param in params:
             if param in seen_params:
@@ -239,14 +313,12 @@ class CodeGen(object):
                 )
             seen_params.add(pydentifier.require_valid(param))
 
-        return ', '.join(params)
+        generated = _function_params[params] = ', '.join(params)
+        return generated
 
     @classmethod
-    def indent(cls, text):
-        return '\n'.join(
-            '    {}'.format(line)
-            for line in text.split('\n')
-        )
+    def indent(cls, text, prefix='    '):
+        return prefix + text.replace('\n', '\n' + prefix)
 
 class UniqueIdentifiers(set):
     def get(self, name):
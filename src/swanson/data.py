@@ -1,10 +1,28 @@
-import copy
+import array
+import errno
+import hashlib
+import marshal
+import os
+import os.path
 import re
+import tempfile
 
-import gherkin_parser
 import six
 
+from swanson import parsing
+
+try:
+    from collections.abc import Sequence
+except ImportError:
+    from collections import Sequence
+
+# Bump when the parsed structure, or its interpretation, changes - previously
+# cached features are then ignored.
+PARSED_CACHE_FORMAT_VERSION = 2
+
 class Feature(object):
+    __slots__ = ('filename', 'tags', 'title', 'description', 'background', 'scenarios', '_scenarios_by_title')
+
     def __init__(self, parsed, filename='<unknown>'):
         def scenario_cls(parsed_scenario):
             if parsed_scenario['title']['is_outline']:
@@ -21,18 +39,91 @@ class Feature(object):
             scenario_cls(parsed_scenario)(self, parsed_scenario)
             for parsed_scenario in parsed['scenarios']
         ]
+        self._scenarios_by_title = None
+
+    def get_scenarios(self, title):
+        """
+        The scenarios titled `title`. There should only be one.
+        """
+
+        if self._scenarios_by_title is None:
+            scenarios_by_title = {}
+            for scenario in self.scenarios:
+                scenarios_by_title.setdefault(scenario.title, []).append(scenario)
+            self._scenarios_by_title = scenarios_by_title
+
+        return self._scenarios_by_title.get(title, [])
 
     @classmethod
-    def from_filename(cls, filename):
-        parsed = gherkin_parser.parse_from_filename(filename)
-        return cls(parsed, filename)
+    def from_filename(cls, filename, cache_dir=None):
+        return cls(parse_filename(filename, cache_dir), filename)
 
     @classmethod
     def from_string(cls, string):
-        parsed = gherkin_parser.parse_lines(string.split('\n'))
+        parsed = parsing.parse_lines(string.split('\n'))
         return cls(parsed)
 
+def parse_filename(filename, cache_dir=None):
+    if cache_dir is None:
+        return parsing.parse_filename(filename)
+    else:
+        return load_parsed_from_filename(filename, cache_dir)
+
+def load_parsed_from_filename(filename, cache_dir):
+    with open(filename, 'rb') as fp:
+        content = fp.read()
+
+    cache_filename = get_parsed_cache_filename(content, cache_dir)
+
+    parsed = load_parsed(cache_filename)
+    if parsed is None:
+        parsed = parsing.parse_bytes(content)
+        store_parsed(cache_filename, parsed)
+
+    return parsed
+
+def get_parsed_cache_filename(content, cache_dir):
+    return os.path.join(cache_dir, '{}.v{}.marshal'.format(
+        hashlib.sha1(content).hexdigest(),
+        PARSED_CACHE_FORMAT_VERSION
+    ))
+
+def load_parsed(cache_filename):
+    try:
+        with open(cache_filename, 'rb') as fp:
+            version, parsed = marshal.load(fp)
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+
+    if version != PARSED_CACHE_FORMAT_VERSION:
+        return None
+
+    return parsed
+
+def store_parsed(cache_filename, parsed):
+    cache_dir = os.path.dirname(cache_filename)
+    try:
+        os.makedirs(cache_dir)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            raise
+
+    # Write to a temporary file and rename, so concurrent test processes never
+    # see a partially written cache file.
+    fd, temp_filename = tempfile.mkstemp(dir=cache_dir)
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            marshal.dump((PARSED_CACHE_FORMAT_VERSION, parsed), fp)
+        os.rename(temp_filename, cache_filename)
+    except OSError:
+        # Another process may have won the race (on Windows, rename won't
+        # replace an existing file). Either way the cache is best-effort.
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+
 class Background(object):
+    __slots__ = ('feature', 'title', 'description', 'steps')
+
     def __init__(self, feature, parsed):
         self.feature = feature
 
@@ -44,6 +135,8 @@ class Background(object):
         ]
 
 class BaseScenario(object):
+    __slots__ = ('feature', 'tags', 'title', 'description', 'steps')
+
     def __init__(self, feature, parsed):
         self.feature = feature
 
@@ -56,6 +149,8 @@ class BaseScenario(object):
         ]
 
 class Scenario(BaseScenario):
+    __slots__ = ('examples',)
+
     def __init__(self, feature, parsed):
         super(Scenario, self).__init__(feature, parsed)
         self.examples = None
@@ -64,43 +159,130 @@ class Scenario(BaseScenario):
         return [self]
 
 class ScenarioOutline(BaseScenario):
+    __slots__ = ('examples', '_step_templates')
+
     def __init__(self, feature, parsed):
         super(ScenarioOutline, self).__init__(feature, parsed)
         self.examples = ScenarioExamples(parsed['examples'])
+        self._step_templates = {}
 
     def expand_examples(self):
-        return [
-            self.for_example(example)
-            for example in self.examples.table.dicts
-        ]
+        return ExpandedExamples(self)
 
     def for_example(self, example):
-        def replacement(match):
-            return example[match.group(1).lower()]
-
         example = {
             key.lower(): value
             for (key, value) in six.iteritems(example)
         }
 
-        regex = re.compile(r'(?i)<({})>'.format('|'.join(
-            re.escape(key)
-            for key in six.iterkeys(example)
-        )))
+        return ExpandedScenario(self, example, self.get_step_templates(example))
+
+    def get_step_templates(self, keys):
+        # Every row of an examples table has the same keys, so templates are
+        # only compiled once per outline.
+        cache_key = tuple(sorted(keys))
+        try:
+            return self._step_templates[cache_key]
+        except KeyError:
+            regex = re.compile(r'(?i)<({})>'.format('|'.join(
+                re.escape(key)
+                for key in cache_key
+            )))
+
+            step_templates = self._step_templates[cache_key] = [
+                (
+                    Template(step.title, regex),
+                    Template(step.text, regex) if step.text else None
+                )
+                for step in self.steps
+            ]
+            return step_templates
+
+class ExpandedExamples(Sequence):
+    """
+    Scenarios for each row of an outline's examples, created on demand.
+    """
+
+    __slots__ = ('_outline', '_table')
+
+    def __init__(self, outline):
+        self._outline = outline
+        self._table = outline.examples.table
+
+    def __len__(self):
+        return max(len(self._table) - 1, 0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in six.moves.range(*index.indices(len(self)))]
 
-        scenario = copy.deepcopy(self)
-        for step in scenario.steps:
-            step.title = regex.sub(replacement, step.title)
-            step.text = regex.sub(replacement, step.text) if step.text else None
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Example index out of range')
 
-        return scenario
+        return self._outline.for_example(self._table.get_dict(index))
+
+    def __iter__(self):
+        for index in six.moves.range(len(self)):
+            yield self._outline.for_example(self._table.get_dict(index))
+
+class ExpandedScenario(BaseScenario):
+    """
+    A scenario outline, with placeholders substituted for a row of examples.
+
+    Shares everything but step titles and text with the outline.
+    """
+
+    __slots__ = ('outline', 'example', 'examples')
+
+    def __init__(self, outline, example, step_templates):
+        self.outline = outline
+        self.example = example
+
+        self.feature = outline.feature
+        self.tags = outline.tags
+        self.title = outline.title
+        self.description = outline.description
+        self.examples = outline.examples
+        self.steps = [
+            ExpandedStep(
+                self,
+                step,
+                title_template.render(example),
+                text_template.render(example) if text_template else None
+            )
+            for step, (title_template, text_template) in six.moves.zip(outline.steps, step_templates)
+        ]
+
+    def expand_examples(self):
+        return [self]
+
+class Template(object):
+    __slots__ = ('_parts',)
+
+    def __init__(self, string, regex):
+        # Alternating literal text and placeholder keys.
+        self._parts = regex.split(string)
+        self._parts[1::2] = [key.lower() for key in self._parts[1::2]]
+
+    def render(self, values):
+        parts = list(self._parts)
+        for index in six.moves.range(1, len(parts), 2):
+            value = values[parts[index]]
+            parts[index] = value if value is not None else ''
+        return ''.join(parts)
 
 class ScenarioExamples(object):
+    __slots__ = ('title', 'table')
+
     def __init__(self, parsed):
         self.title = parsed['title']
         self.table = Table(parsed['table'])
 
 class Step(object):
+    __slots__ = ('scenario', 'index', 'clause', 'title', 'text', 'table')
+
     def __init__(self, scenario, parsed):
         self.scenario = scenario
 
@@ -113,26 +295,185 @@ class Step(object):
     def __str__(self):
         return '{} {}'.format(self.clause.title(), self.title)
 
+    def get_key(self):
+        # Steps with equal keys do exactly the same thing.
+        return (
+            self.clause,
+            self.title,
+            self.text,
+            tuple(tuple(row) for row in self.table) if self.table else None
+        )
+
+def get_common_prefix_length(step_lists, clause='given'):
+    """
+    The number of leading `clause` steps every list of steps has in common.
+    """
+
+    step_lists = iter(step_lists)
+    first_steps = next(step_lists, None)
+    if first_steps is None:
+        return 0
+
+    keys = []
+    for step in first_steps:
+        if step.clause != clause:
+            break
+        keys.append(step.get_key())
+
+    for steps in step_lists:
+        length = 0
+        for step, key in six.moves.zip(steps, keys):
+            if step.get_key() != key:
+                break
+            length += 1
+
+        del keys[length:]
+        if not keys:
+            break
+
+    return len(keys)
+
+class ExpandedStep(Step):
+    __slots__ = ('step',)
+
+    def __init__(self, scenario, step, title, text):
+        self.scenario = scenario
+        self.step = step
+
+        self.index = step.index
+        self.clause = step.clause
+        self.title = title
+        self.text = text
+        self.table = step.table
+
 class Table(object):
+    """
+    A table's cells, stored by column: each column is an array of indexes
+    into its distinct values, so large tables take a byte or two per cell
+    rather than a tuple per row. Rows are decoded as they're read.
+    """
+
+    __slots__ = ('_length', '_header', '_columns', '_values', '_row_lengths')
+
     def __init__(self, parsed):
-        self._rows = [
-            row['columns']
-            for row in parsed
-        ]
+        rows = [row['columns'] for row in parsed]
+        row_lengths = [len(row) for row in rows]
+        width = max(row_lengths) if rows else 0
+
+        self._length = len(rows)
+        self._header = tuple(rows[0]) if rows else None
+
+        columns = []
+        values = []
+        for index in six.moves.range(width):
+            column, column_values = encode_column(
+                row[index] if index < len(row) else None
+                for row in rows
+            )
+            columns.append(column)
+            values.append(column_values)
+        self._columns = tuple(columns)
+        self._values = tuple(values)
+
+        # Only ragged tables need to know where each row ends.
+        if any(row_length != width for row_length in row_lengths):
+            self._row_lengths = array.array(get_typecode(width + 1), row_lengths)
+        else:
+            self._row_lengths = None
 
     def __len__(self):
-        return len(self._rows)
+        return self._length
 
     def __iter__(self):
-        return iter(self._rows)
+        for index in six.moves.range(self._length):
+            yield self.get_row(index)
 
     @property
     def header(self):
-        return self._rows[0]
+        if self._header is None:
+            raise IndexError('Table has no header')
+        return list(self._header)
 
     @property
     def dicts(self):
-        return [
-            dict(six.moves.zip_longest(self.header, row[:len(self.header)]))
-            for row in self._rows[1:]
+        return TableDicts(self)
+
+    def get_row(self, index):
+        row = [
+            column_values[column[index]]
+            for column, column_values in six.moves.zip(self._columns, self._values)
         ]
+        if self._row_lengths is not None:
+            del row[self._row_lengths[index]:]
+        return row
+
+    def get_dict(self, index):
+        header = self._header
+        index += 1
+        if self._row_lengths is None and len(header) == len(self._columns):
+            # The common case, with no short or long rows to allow for.
+            return dict(six.moves.zip(header, [
+                column_values[column[index]]
+                for column, column_values in six.moves.zip(self._columns, self._values)
+            ]))
+
+        row = self.get_row(index)
+        return dict(six.moves.zip_longest(header, row[:len(header)]))
+
+def encode_column(cells):
+    """
+    Returns an array of indexes into a tuple of the distinct cells, which
+    repeated values share.
+    """
+
+    indexes = {}
+    values = []
+    codes = []
+    for cell in cells:
+        try:
+            codes.append(indexes[cell])
+        except KeyError:
+            codes.append(len(values))
+            indexes[cell] = len(values)
+            values.append(cell)
+
+    return array.array(get_typecode(len(values)), codes), tuple(values)
+
+def get_typecode(count):
+    # The smallest unsigned array type that can index `count` values.
+    for typecode in ('B', 'H', 'I'):
+        if count <= 1 << (8 * array.array(typecode).itemsize):
+            return typecode
+    return 'L'
+
+class TableDicts(Sequence):
+    """
+    Table rows as dicts keyed by the header, created on demand.
+    """
+
+    __slots__ = ('_table',)
+
+    def __init__(self, table):
+        self._table = table
+
+    def __len__(self):
+        return max(len(self._table) - 1, 0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in six.moves.range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Table row index out of range')
+
+        return self._table.get_dict(index)
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, tuple, Sequence)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
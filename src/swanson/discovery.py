@@ -0,0 +1,134 @@
+import fnmatch
+import multiprocessing
+import os
+import os.path
+import timeit
+
+from swanson.cache import get_feature_cache, get_stat_key
+from swanson.data import Feature, parse_filename
+from swanson.signals import post_feature_parse
+
+# Directories that never contain a project's features, and can be huge.
+DEFAULT_EXCLUDE = (
+    '.git',
+    '.hg',
+    '.svn',
+    '.tox',
+    '.nox',
+    '.venv',
+    'venv',
+    '__pycache__',
+    '*.egg-info',
+    'node_modules',
+    'site-packages',
+)
+
+# Parsing this many features or fewer isn't worth starting worker processes.
+MIN_PARALLEL_PARSE_COUNT = 16
+
+def iter_feature_filenames(roots=('.',), exclude=DEFAULT_EXCLUDE):
+    for root in roots:
+        if os.path.isfile(root):
+            if root.endswith('.feature'):
+                yield root
+            continue
+
+        for path, dirnames, basenames in os.walk(root):
+            # Prune excluded directories, and virtualenvs whatever they're
+            # called, so we never walk into them.
+            dirnames[:] = sorted(
+                dirname
+                for dirname in dirnames
+                if not is_excluded(os.path.join(path, dirname), exclude, root)
+            )
+
+            for basename in sorted(basenames):
+                if basename.endswith('.feature'):
+                    yield os.path.join(path, basename)
+
+def is_excluded(path, exclude, root='.'):
+    basename = os.path.basename(path)
+    relpath = os.path.relpath(path, root).replace(os.sep, '/')
+    for pattern in exclude:
+        if fnmatch.fnmatch(basename, pattern) or fnmatch.fnmatch(relpath, pattern):
+            return True
+
+    return os.path.isfile(os.path.join(path, 'pyvenv.cfg'))
+
+class FeatureIndex(object):
+    """
+    The features under a set of root directories, parsed through the shared
+    feature cache.
+    """
+
+    def __init__(self, roots=('.',), exclude=DEFAULT_EXCLUDE, feature_cache=None, processes=None):
+        self.roots = tuple(roots)
+        self.exclude = tuple(exclude)
+        self.feature_cache = feature_cache if feature_cache is not None else get_feature_cache()
+        self.processes = processes
+        self._filenames = None
+
+    def get_filenames(self):
+        if self._filenames is None:
+            self._filenames = [
+                os.path.abspath(filename)
+                for filename in iter_feature_filenames(self.roots, self.exclude)
+            ]
+        return self._filenames
+
+    def get_features(self):
+        features = {}
+        uncached = []
+        for filename in self.get_filenames():
+            stat_key = get_stat_key(filename)
+            feature = self.feature_cache.lookup(filename, stat_key)
+            if feature is None:
+                uncached.append((filename, stat_key))
+            else:
+                features[filename] = feature
+
+        for (filename, stat_key), (parsed, duration) in zip(uncached, self.parse([filename for filename, _ in uncached])):
+            feature = features[filename] = Feature(parsed, filename)
+            self.feature_cache.add(filename, stat_key, feature)
+            post_feature_parse.send(sender=self, filename=filename, duration=duration)
+
+        return [features[filename] for filename in self.get_filenames()]
+
+    def parse(self, filenames):
+        args = [(filename, self.feature_cache.cache_dir) for filename in filenames]
+
+        processes = self.processes or multiprocessing.cpu_count()
+        if processes == 1 or len(filenames) <= MIN_PARALLEL_PARSE_COUNT:
+            return [parse_filename_args(arg) for arg in args]
+
+        pool = multiprocessing.Pool(processes=processes)
+        try:
+            return pool.map(parse_filename_args, args, chunksize=8)
+        finally:
+            pool.close()
+            pool.join()
+
+def parse_filename_args(args):
+    # Module-level so it can be pickled for worker processes. Parsing is timed
+    # here, so time spent waiting on the pool isn't counted.
+    start_time = timeit.default_timer()
+    parsed = parse_filename(*args)
+    return parsed, timeit.default_timer() - start_time
+
+_feature_index = None
+
+def get_feature_index():
+    """
+    The index of the project's features, as configured in settings, shared by
+    the test runner and `bddgen`.
+    """
+
+    global _feature_index
+    if _feature_index is None:
+        from swanson import settings
+        _feature_index = FeatureIndex(
+            settings.FEATURE_ROOTS,
+            settings.FEATURE_EXCLUDE,
+            processes=settings.FEATURE_PARSE_PROCESSES
+        )
+    return _feature_index
@@ -0,0 +1,69 @@
+import errno
+import hashlib
+import json
+import os
+import os.path
+import tempfile
+
+def get_file_key(filename):
+    # Relative, with forward slashes, like the scheduling keys.
+    return os.path.relpath(os.path.abspath(filename)).replace(os.sep, '/')
+
+def get_file_hash(filename):
+    try:
+        with open(filename, 'rb') as fp:
+            return hashlib.sha1(fp.read()).hexdigest()
+    except IOError as exc:
+        if exc.errno != errno.ENOENT:
+            raise
+        return None
+
+def load_json(filename):
+    """
+    The JSON in `filename`, or None if there's no such file.
+    """
+
+    try:
+        with open(filename) as fp:
+            return json.load(fp)
+    except IOError as exc:
+        if exc.errno != errno.ENOENT:
+            raise
+        return None
+
+def save_json(filename, data):
+    """
+    Write `data` to `filename` as JSON, all at once, so readers never see a
+    partly written file.
+    """
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_filename = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as fp:
+            json.dump(data, fp, indent=2, sort_keys=True)
+        replace_file(temp_filename, filename)
+    except Exception:
+        os.remove(temp_filename)
+        raise
+
+def rename_over(source, destination):
+    # `os.replace` for Python 2, where Windows won't rename over an existing
+    # file. It's moved aside first, and back if the rename still fails.
+    try:
+        os.rename(source, destination)
+        return
+    except OSError:
+        if not os.path.exists(destination):
+            raise
+
+    backup_filename = '{}.{}.old'.format(destination, os.getpid())
+    os.rename(destination, backup_filename)
+    try:
+        os.rename(source, destination)
+    except OSError:
+        os.rename(backup_filename, destination)
+        raise
+    os.remove(backup_filename)
+
+replace_file = getattr(os, 'replace', rename_over)
@@ -0,0 +1,163 @@
+import errno
+import importlib
+import io
+import multiprocessing
+import os
+import os.path
+import re
+
+import six
+
+from swanson.data import Feature, parse_filename
+from swanson.files import get_file_hash, get_file_key, load_json, save_json
+
+# Generating this many test modules or fewer isn't worth starting worker
+# processes.
+MIN_PARALLEL_GENERATE_COUNT = 16
+
+def get_test_filename(feature_filename):
+    test_filename = re.sub(r'\.feature$', '.py', feature_filename)
+    return os.path.join(
+        os.path.dirname(test_filename),
+        'test_{}'.format(os.path.basename(test_filename))
+    )
+
+_code_generators = {}
+
+def get_code_generator(path):
+    # Imported once per process, rather than once per feature.
+    try:
+        return _code_generators[path]
+    except KeyError:
+        module_name, cls_name = path.rsplit('.', 1)
+        code_generator = _code_generators[path] = getattr(importlib.import_module(module_name), cls_name)
+        return code_generator
+
+def get_manifest_entry(feature_filename, test_filename, code_generator_path):
+    return {
+        'feature': get_file_hash(feature_filename),
+        'test': get_file_hash(test_filename),
+        'generator': code_generator_path
+    }
+
+class GenerationManifest(object):
+    """
+    The hashes of each feature and its test module when `bddgen` last
+    processed them, keyed by feature filename. Features whose hashes still
+    match have nothing new to generate.
+    """
+
+    def __init__(self, features=None):
+        self._features = dict(features or {})
+
+    @classmethod
+    def load(cls, filename):
+        return cls(load_json(filename))
+
+    def save(self, filename):
+        save_json(filename, self._features)
+
+    def record(self, feature_key, entry):
+        self._features[feature_key] = entry
+
+    def is_changed(self, feature_key, entry):
+        return self._features.get(feature_key) != entry
+
+class TestModuleGenerator(object):
+    """
+    Generates test modules for features that don't have one yet, and adds
+    stubs for new scenarios and steps to those that do, parsing and
+    generating in worker processes.
+    """
+
+    def __init__(self, feature_filenames, code_generator_path, manifest=None, processes=None, cache_dir=None):
+        self.feature_filenames = list(feature_filenames)
+        self.code_generator_path = code_generator_path
+        self.manifest = manifest
+        self.processes = processes
+        self.cache_dir = cache_dir
+        # (test filename, error) for each existing test module that couldn't
+        # be parsed, so was left alone.
+        self.skipped = []
+
+    def get_pending(self):
+        """
+        Returns (feature filename, test filename, manifest entry) tuples for
+        the features that have changed since the manifest was saved.
+        """
+
+        pending = []
+        for feature_filename in self.feature_filenames:
+            test_filename = get_test_filename(feature_filename)
+            entry = get_manifest_entry(feature_filename, test_filename, self.code_generator_path)
+            if self.manifest is None or self.manifest.is_changed(get_file_key(feature_filename), entry):
+                pending.append((feature_filename, test_filename, entry))
+        return pending
+
+    def generate(self, pending):
+        args = [
+            (feature_filename, test_filename, self.code_generator_path, self.cache_dir)
+            for feature_filename, test_filename, _ in pending
+        ]
+
+        processes = self.processes or multiprocessing.cpu_count()
+        if processes == 1 or len(args) <= MIN_PARALLEL_GENERATE_COUNT:
+            return [generate_test_module_args(arg) for arg in args]
+
+        pool = multiprocessing.Pool(processes=processes)
+        try:
+            return pool.map(generate_test_module_args, args, chunksize=8)
+        finally:
+            pool.close()
+            pool.join()
+
+    def run(self, write=True):
+        """
+        Returns the filenames of the test modules generated or updated, or
+        that would be if `write` is false.
+        """
+
+        pending = self.get_pending()
+
+        test_filenames = []
+        for (feature_filename, test_filename, entry), (source, error) in zip(pending, self.generate(pending)):
+            if error is not None:
+                # Left out of the manifest, so it's tried again next time.
+                self.skipped.append((test_filename, error))
+                continue
+
+            if source is not None:
+                test_filenames.append(test_filename)
+                if not write:
+                    continue
+
+                with io.open(test_filename, 'w', encoding='utf8') as fp:
+                    # Code generators return native strings.
+                    fp.write(six.text_type(source))
+                entry = dict(entry, test=get_file_hash(test_filename))
+
+            if write and self.manifest is not None:
+                self.manifest.record(get_file_key(feature_filename), entry)
+
+        return test_filenames
+
+def generate_test_module_args(args):
+    # Module-level so it can be pickled for worker processes. Returns the
+    # test module's new source, or None if it's unchanged, and why an
+    # existing test module couldn't be merged into, if it couldn't.
+    feature_filename, test_filename, code_generator_path, cache_dir = args
+    feature = Feature(parse_filename(feature_filename, cache_dir), feature_filename)
+    code_generator = get_code_generator(code_generator_path)
+
+    try:
+        with io.open(test_filename, encoding='utf8') as fp:
+            source = fp.read()
+    except IOError as exc:
+        if exc.errno != errno.ENOENT:
+            raise
+        return code_generator.generate_test_module(feature), None
+
+    try:
+        return code_generator.merge_test_module(feature, source), None
+    except SyntaxError as exc:
+        return None, 'SyntaxError on line {}: {}'.format(exc.lineno, exc.msg)
@@ -1,4 +1,8 @@
 import collections
+import heapq
+import re
+
+import six
 
 from swanson.exceptions import MultipleStepHandlers, NoStepHandlers
 
@@ -7,20 +11,51 @@ Matcher = collections.namedtuple('StepHandler', ('regex', 'clause'))
 
 HandlerMatch = collections.namedtuple('HandlerMatch', ('handler', 'matcher', 'match'))
 
+IndexEntry = collections.namedtuple('IndexEntry', ('position', 'handler_index', 'prefix', 'handler', 'matcher'))
+
+# Hit counts of this module's and swanson.cache's caches.
+CacheInfo = collections.namedtuple('CacheInfo', ('hits', 'misses', 'max_size', 'size'))
+
 class StepHandlers(object):
     def __init__(self, handlers):
         self._handlers = handlers
+        self._clause_indexes = {}
+        self._handler_matches = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._handlers)
+
+    def __iter__(self):
+        return iter(self._handlers)
 
     def get_handler_match_for_step(self, step):
-        handler_matches = []
-        for handler in self._handlers:
-            for matcher in handler.matchers:
-                if matcher.clause is None or matcher.clause == step.clause:
-                    match = matcher.regex.search(step.title)
-                    if match:
-                        handler_matches.append(HandlerMatch(handler, matcher, match))
-                        # Continue to the next handler.
-                        break
+        key = (step.clause, step.title)
+        try:
+            handler_match = self._handler_matches[key]
+        except KeyError:
+            self.misses += 1
+            try:
+                handler_match = self.find_handler_match_for_step(step)
+            except (NoStepHandlers, MultipleStepHandlers) as exc:
+                handler_match = exc
+            self._handler_matches[key] = handler_match
+        else:
+            self.hits += 1
+
+        if isinstance(handler_match, Exception):
+            # Raise a fresh exception, rather than accumulating tracebacks on
+            # the cached one.
+            raise type(handler_match)(*handler_match.args)
+
+        return handler_match
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, None, len(self._handler_matches))
+
+    def find_handler_match_for_step(self, step):
+        handler_matches = self.find_handler_matches_for_step(step)
 
         if not handler_matches:
             raise NoStepHandlers('No step handlers found for {!r}'.format(
@@ -34,3 +69,181 @@ class StepHandlers(object):
             )))
 
         return handler_matches[0]
+
+    def find_handler_matches_for_step(self, step):
+        """
+        Every handler matching `step`, in order. A step should have just one.
+        """
+
+        handler_matches = []
+        matched_handler_indexes = set()
+        for entry in self.get_clause_index(step.clause).iter_candidates(step.title):
+            # Only the first matching matcher of each handler counts.
+            if entry.handler_index in matched_handler_indexes:
+                continue
+
+            match = entry.matcher.regex.search(step.title)
+            if match:
+                handler_matches.append(HandlerMatch(entry.handler, entry.matcher, match))
+                matched_handler_indexes.add(entry.handler_index)
+
+        return handler_matches
+
+    def get_clause_index(self, clause):
+        try:
+            return self._clause_indexes[clause]
+        except KeyError:
+            index = self._clause_indexes[clause] = MatcherIndex(
+                (handler_index, handler, matcher)
+                for handler_index, handler in enumerate(self._handlers)
+                for matcher in handler.matchers
+                if matcher.clause is None or matcher.clause == clause
+            )
+            return index
+
+def get_handler_name(handler):
+    func = handler.func
+    return '{}.{}'.format(func.__module__, getattr(func, '__qualname__', func.__name__))
+
+class MatcherIndex(object):
+    """
+    Matchers anchored to a literal prefix are only tried against titles
+    starting with that prefix. Candidates keep their original order, so
+    ambiguity is reported exactly as if every matcher were tried.
+    """
+
+    def __init__(self, handler_matchers):
+        self._prefixed = collections.defaultdict(list)
+        self._unprefixed = []
+
+        for position, (handler_index, handler, matcher) in enumerate(handler_matchers):
+            prefix = get_literal_prefix(matcher.regex)
+            entry = IndexEntry(position, handler_index, prefix, handler, matcher)
+            if prefix:
+                self._prefixed[prefix[0]].append(entry)
+            else:
+                self._unprefixed.append(entry)
+
+        self._max_prefix_length = max([
+            len(entry.prefix)
+            for entries in self._prefixed.values()
+            for entry in entries
+        ] or [0])
+
+    def iter_candidates(self, title):
+        folded_title = fold_case(title[:self._max_prefix_length])
+        prefixed = [
+            entry
+            for entry in self._prefixed.get(folded_title[:1], ())
+            if folded_title.startswith(entry.prefix)
+        ]
+        return heapq.merge(prefixed, self._unprefixed)
+
+# Characters that case-insensitive regexes treat as equal to an ASCII letter,
+# but which don't lowercase to it.
+CASE_FOLDS = {
+    u'\u0130': u'i',
+    u'\u0131': u'i',
+    u'\u017f': u's'
+}
+
+def fold_case(string):
+    folded = []
+    for char in string:
+        char = CASE_FOLDS.get(char, char)
+        lower = char.lower()
+        folded.append(lower if len(lower) == 1 else char)
+    return u''.join(folded)
+
+LEADING_FLAGS_REGEX = re.compile(r'^(?:\(\?[a-zA-Z]+\))*')
+
+def get_literal_prefix(regex):
+    """
+    Return the case-folded literal text every match of `regex` must start
+    with, or an empty string if there isn't any.
+    """
+
+    if regex.flags & (re.MULTILINE | re.VERBOSE):
+        return ''
+
+    pattern = regex.pattern
+    if not isinstance(pattern, six.string_types):
+        return ''
+
+    if has_top_level_alternation(pattern):
+        return ''
+
+    index = LEADING_FLAGS_REGEX.match(pattern).end()
+    if pattern[index:index + 1] == '^':
+        index += 1
+    elif pattern[index:index + 2] == '\\A':
+        index += 2
+    else:
+        return ''
+
+    chars = []
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            escaped = pattern[index + 1:index + 2]
+            if not escaped or escaped.isalnum() or escaped == '_':
+                break
+            literal, length = escaped, 2
+        elif char in '.^$*+?{}[]|()':
+            break
+        else:
+            literal, length = char, 1
+
+        # Keep to ASCII, where case-folding is unambiguous.
+        if ord(literal) > 127:
+            break
+
+        quantifier = pattern[index + length:index + length + 1]
+        if quantifier and quantifier in '*?{':
+            break
+
+        chars.append(literal.lower())
+        index += length
+
+        if quantifier == '+':
+            break
+
+    return ''.join(chars)
+
+def has_top_level_alternation(pattern):
+    depth = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            index += 2
+            continue
+        elif char == '[':
+            index = skip_character_class(pattern, index)
+            continue
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+        index += 1
+
+    return False
+
+def skip_character_class(pattern, index):
+    index += 1
+    if pattern[index:index + 1] == '^':
+        index += 1
+    # A ']' straight after the opening bracket is literal.
+    if pattern[index:index + 1] == ']':
+        index += 1
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            index += 2
+            continue
+        index += 1
+        if char == ']':
+            break
+    return index
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from swanson.options import add_options, get_option_list, option
+
+OPTIONS = (
+    option(
+        '--format', choices=('text', 'json'), default='text',
+        help='Report format.'
+    ),
+)
+
+class Command(BaseCommand):
+    help = 'Match every step of every feature against its test case\'s step handlers, without running any tests.'
+
+    if not hasattr(BaseCommand, 'add_arguments'):
+        # Django < 1.8 takes optparse options, and positional arguments as
+        # `args`.
+        option_list = BaseCommand.option_list + get_option_list(OPTIONS)
+        args = '[test_label ...]'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'test_labels', nargs='*',
+            help='Modules, classes or directories of tests to check, as for the test command.'
+        )
+        add_options(parser, OPTIONS)
+
+    def handle(self, *args, **options):
+        import json
+
+        from django.conf import settings
+        from django.test.utils import get_runner
+
+        from swanson.test.step_coverage import StepCoverage
+
+        # The test runner finds and imports the test modules, just as for a
+        # test run.
+        runner = get_runner(settings)(verbosity=0)
+        suite = runner.build_suite(options.get('test_labels') or args)
+        coverage = StepCoverage.from_suite(suite)
+
+        if options.get('format') == 'json':
+            self.stdout.write(json.dumps(coverage.as_dict(), indent=2, sort_keys=True))
+        else:
+            self.stdout.write(coverage.format_report())
+
+        if coverage.undefined or coverage.ambiguous:
+            raise CommandError('{} undefined and {} ambiguous steps'.format(
+                len(coverage.undefined),
+                len(coverage.ambiguous)
+            ))
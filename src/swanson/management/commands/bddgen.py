@@ -1,49 +1,94 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+from swanson.options import add_options, get_option_list, option
+
+OPTIONS = (
+    option(
+        '--check', action='store_true', default=False,
+        help='Write nothing, and fail if any test modules need generating or updating.'
+    ),
+    option(
+        '--manifest', metavar='FILENAME',
+        help='Record feature hashes here, and skip features unchanged since. '
+             'Defaults to SWANSON_BDDGEN_MANIFEST.'
+    )
+)
 
 class Command(BaseCommand):
-    def handle(self, *paths, **options):
-        import importlib
-        import os
+    help = 'Generate test modules for features, or add stubs for new scenarios and steps to existing ones.'
+
+    if not hasattr(BaseCommand, 'add_arguments'):
+        # Django < 1.8 takes optparse options, and positional arguments as
+        # `args`.
+        option_list = BaseCommand.option_list + get_option_list(OPTIONS)
+        args = '[path ...]'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Features, or directories to look for them in. Defaults to SWANSON_FEATURE_ROOTS.'
+        )
+        add_options(parser, OPTIONS)
+
+    def handle(self, *args, **options):
         import os.path
-        import re
 
         from swanson import settings
-        from swanson.data import Feature
-
-        def main(paths):
-            generated_filenames = []
-
-            module_name, cls_name = settings.CODE_GENERATOR.rsplit('.', 1)
-            code_gen_cls = getattr(importlib.import_module(module_name), cls_name)()
-
-            for path in paths:
-                for feature_filename in iter_feature_filenames(path):
-                    feature = Feature.from_filename(feature_filename)
-
-                    test_filename = re.sub(r'\.feature$', '.py', feature_filename)
-                    test_filename = os.path.join(
-                        os.path.dirname(test_filename),
-                        'test_{}'.format(os.path.basename(test_filename))
-                    )
-                    
-                    if not os.path.isfile(test_filename):
-                        test_module_source = code_gen_cls.generate_test_module(feature)
-                        with open(test_filename, 'w') as fp:
-                            fp.write(test_module_source)
-                        generated_filenames.append(test_filename)
-
-            if generated_filenames:
-                self.stdout.write('Generated code:\n{}'.format('\n'.join(
-                    ' * {}'.format(os.path.relpath(filename))
-                    for filename in generated_filenames
-                )))
-            else:
-                self.stdout.write('No files to generate')
-
-        def iter_feature_filenames(path):
-            for path, _, basenames in os.walk(path):
-                for basename in basenames:
-                    if basename.endswith('.feature'):
-                        yield os.path.join(path, basename)
-
-        main(paths or ('.',))
+        from swanson.discovery import FeatureIndex, get_feature_index
+        from swanson.generation import GenerationManifest, TestModuleGenerator
+
+        paths = options.get('paths') or args
+        if paths:
+            feature_index = FeatureIndex(
+                paths,
+                settings.FEATURE_EXCLUDE,
+                processes=settings.FEATURE_PARSE_PROCESSES
+            )
+        else:
+            feature_index = get_feature_index()
+
+        manifest_filename = options.get('manifest') or settings.BDDGEN_MANIFEST
+        manifest = GenerationManifest.load(manifest_filename) if manifest_filename else None
+
+        generator = TestModuleGenerator(
+            feature_index.get_filenames(),
+            settings.CODE_GENERATOR,
+            manifest=manifest,
+            processes=settings.FEATURE_PARSE_PROCESSES,
+            cache_dir=settings.FEATURE_CACHE_DIR
+        )
+
+        check = options.get('check')
+        test_filenames = generator.run(write=not check)
+        listing = '\n'.join(
+            ' * {}'.format(os.path.relpath(filename))
+            for filename in test_filenames
+        )
+
+        skipped_listing = '\n'.join(
+            ' * {} ({})'.format(os.path.relpath(filename), error)
+            for filename, error in generator.skipped
+        )
+
+        if check:
+            # A module that can't be parsed can't be checked either.
+            errors = []
+            if test_filenames:
+                errors.append('Test modules need generating or updating:\n{}'.format(listing))
+            if generator.skipped:
+                errors.append('Test modules could not be parsed:\n{}'.format(skipped_listing))
+            if errors:
+                raise CommandError('\n'.join(errors))
+            self.stdout.write('Test modules are up to date')
+            return
+
+        if generator.skipped:
+            self.stderr.write('Skipped test modules that could not be parsed:\n{}'.format(skipped_listing))
+
+        if manifest is not None:
+            manifest.save(manifest_filename)
+
+        if test_filenames:
+            self.stdout.write('Generated code:\n{}'.format(listing))
+        else:
+            self.stdout.write('No files to generate')
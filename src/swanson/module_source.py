@@ -0,0 +1,197 @@
+"""
+The scenarios and step handlers a test module defines, found from its source
+without importing it.
+"""
+
+import ast
+import re
+
+import six
+
+from swanson.exceptions import MultipleStepHandlers, NoStepHandlers
+from swanson.handlers import Matcher, StepHandler, StepHandlers
+
+# Decorator names, and the clause each matches.
+STEP_DECORATORS = {
+    'step': None,
+    'given': 'given',
+    'when': 'when',
+    'then': 'then'
+}
+
+# Base classes that define no step handlers of their own.
+HANDLERLESS_BASES = frozenset([
+    'object',
+    'TestCaseMixin',
+    'SimpleTestCase',
+    'TransactionTestCase',
+    'TestCase',
+    'LiveServerTestCase'
+])
+
+class TestCaseSource(object):
+    """
+    A test case class in a module's source: the scenarios its methods run,
+    and its step handlers, including those of base classes in the same
+    module.
+    """
+
+    def __init__(self, node, end_line, handlers, has_unknown_handlers):
+        self.name = node.name
+        self.end_line = end_line
+        # Python 2 gives multi-line strings, like docstrings, a col_offset of
+        # -1, so go by the first member with a real one.
+        col_offsets = [child.col_offset for child in node.body if child.col_offset >= 0]
+        self.indent = ' ' * (col_offsets[0] if col_offsets else node.col_offset + 4)
+        self.member_names = set(get_member_names(node))
+
+        titles = list(iter_scenario_titles(node))
+        self.scenario_titles = set(title for title in titles if title is not None)
+        # Titles that aren't literals could be anything.
+        self.has_unknown_scenarios = None in titles
+
+        self.handlers = handlers
+        # Likewise patterns that aren't literals, and handlers inherited from
+        # other modules.
+        self.has_unknown_handlers = has_unknown_handlers
+
+    def get_missing_steps(self, steps):
+        step_handlers = StepHandlers(self.handlers)
+        for step in steps:
+            try:
+                step_handlers.get_handler_match_for_step(step)
+            except NoStepHandlers:
+                yield step
+            except MultipleStepHandlers:
+                # Handled, if ambiguously.
+                pass
+
+def iter_test_case_sources(source):
+    lines = source.splitlines()
+    nodes = ast.parse(source).body
+
+    class_handlers = {}
+    for index, node in enumerate(nodes):
+        if not isinstance(node, ast.ClassDef):
+            continue
+
+        handlers = []
+        has_unknown_handlers = False
+        for handler in iter_step_handlers(node):
+            if handler is None:
+                has_unknown_handlers = True
+            else:
+                handlers.append(handler)
+
+        for base_name in (get_name(base) for base in node.bases):
+            if base_name in class_handlers:
+                handlers.extend(class_handlers[base_name][0])
+                has_unknown_handlers = has_unknown_handlers or class_handlers[base_name][1]
+            elif base_name not in HANDLERLESS_BASES:
+                has_unknown_handlers = True
+        class_handlers[node.name] = (handlers, has_unknown_handlers)
+
+        next_line = get_first_line(nodes[index + 1]) - 1 if index + 1 < len(nodes) else len(lines)
+        yield TestCaseSource(node, get_end_line(lines, next_line), handlers, has_unknown_handlers)
+
+def get_test_case_source(source, name):
+    """
+    The test case class called `name`, or failing that the first that runs
+    scenarios or handles steps. None if there isn't one.
+    """
+
+    test_cases = list(iter_test_case_sources(source))
+    for test_case in test_cases:
+        if test_case.name == name:
+            return test_case
+    for test_case in test_cases:
+        if test_case.scenario_titles or test_case.handlers:
+            return test_case
+    return None
+
+def get_first_line(node):
+    return min([node.lineno] + [decorator.lineno for decorator in getattr(node, 'decorator_list', ())])
+
+def get_end_line(lines, end_line):
+    # Step back over blank lines and unindented comments, which come before
+    # whatever follows the class.
+    while end_line > 0:
+        line = lines[end_line - 1]
+        if line.strip() and not line.startswith('#'):
+            break
+        end_line -= 1
+    return end_line
+
+def get_name(node):
+    # The last part of a name such as `swanson.given`.
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+def get_string(node):
+    value = getattr(node, 'value', getattr(node, 's', None))
+    return value if isinstance(value, six.string_types) else None
+
+def get_member_names(node):
+    for child in node.body:
+        if isinstance(child, (ast.FunctionDef, ast.ClassDef)):
+            yield child.name
+        elif isinstance(child, ast.Assign):
+            for target in child.targets:
+                if isinstance(target, ast.Name):
+                    yield target.id
+
+def iter_scenario_titles(node):
+    # Yields None for titles that aren't literals.
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call) and get_name(child.func) == 'run_scenario':
+            yield get_string(child.args[0]) if child.args else None
+
+def iter_step_handlers(node):
+    # Yields None for handlers with patterns that aren't literals.
+    for child in node.body:
+        if not isinstance(child, ast.FunctionDef):
+            continue
+
+        decorators = [
+            decorator
+            for decorator in child.decorator_list
+            if isinstance(decorator, ast.Call) and get_name(decorator.func) in STEP_DECORATORS
+        ]
+        if not decorators:
+            continue
+
+        # The top decorator is applied last, so its matcher comes first.
+        matchers = tuple(get_matcher(decorator) for decorator in decorators)
+        if None in matchers:
+            yield None
+        else:
+            yield StepHandler(matchers=matchers, func=child.name)
+
+def get_matcher(decorator):
+    """
+    The matcher a `@given(...)`-style decorator creates, if its pattern is a
+    literal, valid regex.
+    """
+
+    pattern = get_string(decorator.args[0]) if decorator.args else None
+    if pattern is None:
+        return None
+
+    name = get_name(decorator.func)
+    clause = STEP_DECORATORS[name]
+    if name == 'step':
+        clause_nodes = decorator.args[1:2] + [
+            keyword.value
+            for keyword in decorator.keywords
+            if keyword.arg == 'clause'
+        ]
+        if clause_nodes:
+            clause = get_string(clause_nodes[0])
+
+    try:
+        return Matcher(regex=re.compile(pattern), clause=clause)
+    except re.error:
+        return None
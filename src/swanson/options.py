@@ -0,0 +1,24 @@
+"""
+Command line options, declared once as `add_argument` calls, for argparse
+and for optparse on Django < 1.8.
+"""
+
+def option(*flags, **kwargs):
+    return flags, kwargs
+
+def add_options(parser, options):
+    for flags, kwargs in options:
+        parser.add_argument(*flags, **kwargs)
+
+def get_option_list(options):
+    from optparse import make_option
+
+    option_list = []
+    for flags, kwargs in options:
+        kwargs = dict(kwargs)
+        if kwargs.get('type') is int:
+            kwargs['type'] = 'int'
+        elif 'choices' in kwargs:
+            kwargs['type'] = 'choice'
+        option_list.append(make_option(*flags, **kwargs))
+    return tuple(option_list)
@@ -0,0 +1,141 @@
+"""
+Parse feature files with gherkin_parser, streaming table rows past it.
+
+gherkin_parser backtracks over a tuple of every line in the file, and parses
+table rows a character at a time, which is slow for the very large tables
+generated features can have. So lines are read one at a time, and only the
+first row of each table is given to gherkin_parser - the rest are replaced
+with blank lines, keeping line numbers the same, and parsed separately.
+"""
+
+import io
+import re
+
+import gherkin_parser
+import six
+from gherkin_parser.parser import Line, table_row_parser
+
+STEP_TITLE_REGEX = re.compile(r'(?i)^\s*(?:given|when|then|and|but)\s+')
+EXAMPLES_TITLE_REGEX = re.compile(r'(?i)^\s*examples\s*:')
+TEXT_BLOCK_DELIMITERS = ('"""', "'''")
+
+def parse_filename(filename):
+    with io.open(filename, encoding='utf8') as fp:
+        return parse_lines(fp)
+
+def parse_bytes(content):
+    # Lines are split as when reading the file, on universal newlines only,
+    # not on every line boundary `splitlines` knows, like U+2028.
+    return parse_lines(io.StringIO(content.decode('utf8'), newline=None))
+
+def parse_lines(strings):
+    """
+    Parse an iterable of lines, giving the same result as
+    `gherkin_parser.parse_lines`.
+    """
+
+    lines, tables = split_tables(strings)
+    parsed = gherkin_parser.parse_lines(lines)
+
+    # Tables are found by their first row's line index.
+    merged_count = 0
+    in_order = True
+    for rows in iter_parsed_tables(parsed):
+        try:
+            table_lines = tables[rows[0]['index']]
+        except KeyError:
+            continue
+        in_order = in_order and rows[-1]['index'] < table_lines[0][0]
+        rows.extend(parse_table_rows(table_lines))
+        merged_count += 1
+
+    if merged_count != len(tables) or not in_order:
+        # Something that looked like a table wasn't one, e.g. rows in a
+        # description, or one was split by a text block. Let gherkin_parser
+        # see everything.
+        for table_lines in six.itervalues(tables):
+            for index, string in table_lines:
+                lines[index] = string
+        parsed = gherkin_parser.parse_lines(lines)
+
+    return parsed
+
+def split_tables(strings):
+    """
+    Returns the lines for gherkin_parser, with all but the first row of each
+    table blanked out, and a dict of each table's first row index to its
+    remaining rows, as (index, line) tuples.
+    """
+
+    lines = []
+    tables = {}
+    table_lines = None
+    can_start_table = False
+    text_block_delimiter = None
+
+    for index, string in enumerate(strings):
+        stripped = string.strip()
+
+        if text_block_delimiter is not None:
+            if stripped == text_block_delimiter:
+                text_block_delimiter = None
+            lines.append(string)
+            continue
+
+        if stripped.startswith('|') and stripped.endswith('|'):
+            if table_lines is not None:
+                table_lines.append((index, string))
+                lines.append(u'')
+                continue
+
+            if can_start_table:
+                table_lines = tables[index] = []
+            lines.append(string)
+            continue
+
+        if stripped == '' or stripped.startswith('#'):
+            # gherkin_parser skips blank and comment lines between rows.
+            lines.append(string)
+            continue
+
+        table_lines = None
+        if stripped in TEXT_BLOCK_DELIMITERS:
+            text_block_delimiter = stripped
+            # A table can follow a step's text block.
+            can_start_table = True
+        else:
+            can_start_table = bool(STEP_TITLE_REGEX.match(string) or EXAMPLES_TITLE_REGEX.match(string))
+
+        lines.append(string)
+
+    # Tables of a single row need no merging.
+    for first_index, table_lines in list(six.iteritems(tables)):
+        if not table_lines:
+            del tables[first_index]
+
+    return lines, tables
+
+def iter_parsed_tables(parsed):
+    scenarios = list(parsed['scenarios'])
+    if parsed['background']:
+        scenarios.append(parsed['background'])
+
+    for scenario in scenarios:
+        for step in scenario['steps']:
+            if step['table']:
+                yield step['table']
+        if scenario.get('examples') and scenario['examples']['table']:
+            yield scenario['examples']['table']
+
+def parse_table_rows(table_lines):
+    for index, string in table_lines:
+        content = string.strip()
+        if '\\' in content:
+            # Escapes are rare, so leave them to gherkin_parser.
+            _, row = table_row_parser({'comment_cache': {}, 'dict_cls': dict}, 0, [Line(index, string)])
+            yield row
+        else:
+            yield {
+                'index': index,
+                'columns': [column.strip() for column in content[1:-1].split('|')] if len(content) > 1 else []
+            }
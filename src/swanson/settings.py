@@ -1,3 +1,13 @@
 from django.conf import settings
 
+from swanson.discovery import DEFAULT_EXCLUDE as DEFAULT_FEATURE_EXCLUDE
+
 CODE_GENERATOR = getattr(settings, 'SWANSON_CODE_GENERATOR', 'swanson.codegen.CodeGen')
+FEATURE_CACHE_SIZE = getattr(settings, 'SWANSON_FEATURE_CACHE_SIZE', 128)
+FEATURE_CACHE_DIR = getattr(settings, 'SWANSON_FEATURE_CACHE_DIR', None)
+TIMINGS_FILE = getattr(settings, 'SWANSON_TIMINGS_FILE', None)
+FEATURE_ROOTS = getattr(settings, 'SWANSON_FEATURE_ROOTS', ('.',))
+FEATURE_EXCLUDE = getattr(settings, 'SWANSON_FEATURE_EXCLUDE', DEFAULT_FEATURE_EXCLUDE)
+FEATURE_PARSE_PROCESSES = getattr(settings, 'SWANSON_FEATURE_PARSE_PROCESSES', None)
+PROFILE_DIR = getattr(settings, 'SWANSON_PROFILE_DIR', 'swanson-profiles')
+BDDGEN_MANIFEST = getattr(settings, 'SWANSON_BDDGEN_MANIFEST', None)
@@ -1,3 +1,11 @@
 import django.dispatch
 
 pre_scenario_test = django.dispatch.Signal(providing_args=('feature_filename', 'scenario_title'))
+post_scenario_test = django.dispatch.Signal(providing_args=('feature_filename', 'scenario_title', 'duration', 'success', 'handlers'))
+
+post_example_test = django.dispatch.Signal(providing_args=('feature_filename', 'scenario_title', 'example_index', 'example', 'duration', 'success'))
+
+pre_step_test = django.dispatch.Signal(providing_args=('feature_filename', 'scenario_title', 'step'))
+post_step_test = django.dispatch.Signal(providing_args=('feature_filename', 'scenario_title', 'step', 'handler_match', 'match_duration', 'run_duration', 'success'))
+
+post_feature_parse = django.dispatch.Signal(providing_args=('filename', 'duration'))
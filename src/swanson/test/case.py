@@ -1,47 +1,265 @@
+import contextlib
+import copy
 import os.path
 import re
 import sys
+import timeit
 
 import six
 from django import test
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
 
-from swanson.data import Feature
+from swanson.cache import get_feature
+from swanson.data import get_common_prefix_length
 from swanson.exceptions import StepError
 from swanson.handlers import StepHandler, StepHandlers
-from swanson.signals import pre_scenario_test
+from swanson.signals import post_example_test, post_scenario_test, post_step_test, pre_scenario_test, pre_step_test
+
+# The test clients Django gives each test, and their classes' attributes.
+CLIENT_CLASS_NAMES = (('client', 'client_class'), ('async_client', 'async_client_class'))
 
 class TestCaseMixin(object):
+    # Run the feature's Background once for the whole test case, rather than
+    # before every scenario. Only `TestCase` supports this.
+    run_background_once = False
+
+    # Run Given steps that scenarios - or an outline's example rows - start
+    # with once, rolling the database back to the state they leave before the
+    # rest of each scenario. Implies `run_background_once`. Only `TestCase`
+    # supports this.
+    share_step_prefixes = False
+
+    # Stop running a Scenario Outline's example rows at the first that fails,
+    # rather than reporting each failing row as a subtest.
+    stop_at_first_failing_example = False
+
+    # The feature's filename, if not the test module's, minus its `test_`
+    # prefix, with a `.feature` extension.
+    feature_filename = None
+
+    # Tags, like `@slow`, or title regexes of scenarios to always profile, as
+    # with `--profile`.
+    profile_scenarios = None
+
     def run_scenario(self, title):
+        feature_filename = self.get_feature_filename()
+
         pre_scenario_test.send(
             sender=self,
-            feature_filename=self.get_feature_filename(),
+            feature_filename=feature_filename,
             scenario_title=title
         )
 
+        handlers = set()
+        if self.background_runs_once():
+            self.restore_class_setup_cookies()
+            # Every scenario depends on the steps class setup ran.
+            handlers.update(getattr(type(self), '_class_setup_handlers', ()))
+
+        start_time = timeit.default_timer()
+        success = False
+        try:
+            # Example rows share the test's database, so the Background runs
+            # once, before the first row.
+            if not self.background_runs_once():
+                handlers.update(self.run_background(title))
+
+            example_handlers, success = self.run_examples(
+                self.get_scenario(title).expand_examples(),
+                self.get_shared_step_count(),
+                title
+            )
+            handlers.update(example_handlers)
+        finally:
+            post_scenario_test.send(
+                sender=self,
+                feature_filename=feature_filename,
+                scenario_title=title,
+                duration=timeit.default_timer() - start_time,
+                success=success,
+                handlers=handlers
+            )
+
+    def run_examples(self, scenarios, skip_step_count, title):
+        """
+        Run each expanded scenario's steps, after the first `skip_step_count`.
+        Returns the step handlers used, and whether every example passed.
+        """
+
+        handlers = []
+        failed_indexes = []
+        for index, scenario in enumerate(scenarios):
+            if getattr(scenario, 'example', None) is None:
+                # A plain scenario.
+                handlers.extend(self.run_example(scenario, skip_step_count, title))
+                continue
+
+            with self.example_context(scenario, index, failed_indexes):
+                handlers.extend(self.run_example(scenario, skip_step_count, title))
+
+            if failed_indexes and self.stop_at_first_failing_example:
+                break
+
+        return handlers, not failed_indexes
+
+    def run_example(self, scenario, skip_step_count, title):
+        return self.run_steps(scenario.steps[skip_step_count:], title)
+
+    @contextlib.contextmanager
+    def example_context(self, scenario, index, failed_indexes):
+        """
+        Time an example row, and report it as a subtest where supported, so a
+        failing row doesn't stop the others running.
+        """
+
+        subtest_context = None
+        if hasattr(self, 'subTest') and not self.stop_at_first_failing_example:
+            subtest_context = self.subTest(example=index + 1, values=scenario.example)
+
+        start_time = timeit.default_timer()
+        success = False
+        with subtest_context or no_context():
+            try:
+                yield
+                success = True
+            except Exception:
+                failed_indexes.append(index)
+                raise
+            finally:
+                post_example_test.send(
+                    sender=self,
+                    feature_filename=self.get_feature_filename(),
+                    scenario_title=scenario.title,
+                    example_index=index,
+                    example=scenario.example,
+                    duration=timeit.default_timer() - start_time,
+                    success=success
+                )
+
+    def run_steps(self, steps, scenario_title):
         step_handlers = self.get_step_handlers()
-        for scenario in self.get_scenario(title).expand_examples():
-            for step in scenario.steps:
-                try:
-                    handler_match = step_handlers.get_handler_match_for_step(step)
-                    handler_match.handler.func(self, step, *handler_match.match.groups())
-                except Exception as exc:
-                    new_exc = StepError('Error running {!r} on line {} of {}:\n\n{}: {}'.format(
-                        str(step),
-                        step.index + 1,
-                        os.path.relpath(step.scenario.feature.filename),
-                        type(exc).__name__,
-                        exc
-                    ))
-                    six.reraise(type(new_exc), new_exc, sys.exc_info()[2])
+        feature_filename = self.get_feature_filename()
+        return [
+            self.run_step(step, step_handlers, feature_filename, scenario_title).handler
+            for step in steps
+        ]
+
+    def run_background(self, scenario_title=None):
+        background = self.get_feature().background
+        if background is None:
+            return []
+
+        return self.run_steps(background.steps, scenario_title or background.title)
+
+    def run_shared_steps(self):
+        shared_step_count = self.get_shared_step_count()
+        if shared_step_count:
+            # An outline with no example rows has nothing to share with.
+            scenario = next(self.iter_expanded_scenarios())
+            return self.run_steps(scenario.steps[:shared_step_count], scenario.title)
+        return []
+
+    def iter_expanded_scenarios(self):
+        for outline in self.get_feature().scenarios:
+            for scenario in outline.expand_examples():
+                yield scenario
+
+    @classmethod
+    def run_class_setup(cls):
+        """
+        Run the Background's steps, and any steps shared by every scenario, on
+        a throwaway instance, then copy any attributes they set onto the
+        class, where every test can see them. Database changes are rolled back
+        to this point after each test.
+        """
+
+        test_case = cls('run_background')
+        # The instance isn't run as a test, so Django hasn't given it test
+        # clients. Each test's clients start with the cookies - a login, say -
+        # these are left with.
+        client_names = test_case.create_clients()
+        initial_names = set(vars(test_case))
+        handlers = test_case.run_background() + test_case.run_shared_steps()
+
+        for name, value in six.iteritems(vars(test_case)):
+            if name not in initial_names:
+                setattr(cls, name, value)
+
+        cls._class_setup_cookies = dict(
+            (name, getattr(test_case, name).cookies)
+            for name in client_names
+        )
+        cls._class_setup_handlers = frozenset(handlers)
+
+    def create_clients(self):
+        names = []
+        for name, class_name in CLIENT_CLASS_NAMES:
+            client_class = getattr(self, class_name, None)
+            if client_class is not None:
+                setattr(self, name, client_class())
+                names.append(name)
+        return names
+
+    def restore_class_setup_cookies(self):
+        for name, cookies in six.iteritems(getattr(type(self), '_class_setup_cookies', None) or {}):
+            client = getattr(self, name, None)
+            if client is not None:
+                client.cookies = copy.deepcopy(cookies)
+
+    @classmethod
+    def background_runs_once(cls):
+        return False
+
+    @classmethod
+    def get_shared_step_count(cls):
+        # Set up by test case classes that support sharing steps.
+        return cls.__dict__.get('_shared_step_count', 0)
+
+    def run_step(self, step, step_handlers, feature_filename, scenario_title):
+        pre_step_test.send(
+            sender=self,
+            feature_filename=feature_filename,
+            scenario_title=scenario_title,
+            step=step
+        )
+
+        handler_match = None
+        start_time = timeit.default_timer()
+        match_time = None
+        success = False
+        try:
+            handler_match = step_handlers.get_handler_match_for_step(step)
+            match_time = timeit.default_timer()
+            handler_match.handler.func(self, step, *handler_match.match.groups())
+            success = True
+        except Exception as exc:
+            new_exc = StepError('Error running {!r} on line {} of {}:\n\n{}: {}'.format(
+                str(step),
+                step.index + 1,
+                os.path.relpath(step.scenario.feature.filename),
+                type(exc).__name__,
+                exc
+            ))
+            six.reraise(type(new_exc), new_exc, sys.exc_info()[2])
+        finally:
+            end_time = timeit.default_timer()
+            if match_time is None:
+                match_time = end_time
+            post_step_test.send(
+                sender=self,
+                feature_filename=feature_filename,
+                scenario_title=scenario_title,
+                step=step,
+                handler_match=handler_match,
+                match_duration=match_time - start_time,
+                run_duration=end_time - match_time,
+                success=success
+            )
+
+        return handler_match
 
     def get_scenario(self, title):
-        feature = self.get_feature()
-        
-        matching_scenarios = [
-            scenario
-            for scenario in feature.scenarios
-            if scenario.title == title
-        ]
+        matching_scenarios = self.get_feature().get_scenarios(title)
 
         if len(matching_scenarios) == 0:
             raise Exception('No scenarios named {!r}'.format(title))
@@ -51,9 +269,12 @@ class TestCaseMixin(object):
             return matching_scenarios[0]
 
     def get_feature(self):
-        return Feature.from_filename(self.get_feature_filename())
+        return get_feature(self.get_feature_filename())
 
     def get_feature_filename(self):
+        if self.feature_filename is not None:
+            return self.feature_filename
+
         filename = sys.modules[self.__module__].__file__
         return os.path.join(
             os.path.dirname(filename),
@@ -63,13 +284,22 @@ class TestCaseMixin(object):
         )
 
     def get_step_handlers(self):
-        step_handlers = []
-        for name in dir(self):
-            value = getattr(self, name)
-            if isinstance(value, StepHandler):
-                step_handlers.append(value)
+        return type(self).get_class_step_handlers()
+
+    @classmethod
+    def get_class_step_handlers(cls):
+        # Look in the class's own __dict__, so subclasses don't pick up their
+        # parent's handlers.
+        step_handlers = cls.__dict__.get('_step_handlers')
+        if step_handlers is None:
+            step_handlers = StepHandlers([
+                value
+                for value in (getattr(cls, name) for name in dir(cls))
+                if isinstance(value, StepHandler)
+            ])
+            cls._step_handlers = step_handlers
 
-        return StepHandlers(step_handlers)
+        return step_handlers
 
 class SimpleTestCase(TestCaseMixin, test.SimpleTestCase):
     pass
@@ -78,7 +308,83 @@ class TransactionTestCase(TestCaseMixin, test.TransactionTestCase):
     pass
 
 class TestCase(TestCaseMixin, test.TestCase):
-    pass
+    @classmethod
+    def setUpClass(cls):
+        if cls.background_runs_once():
+            # Collect the step handlers now, or Django will treat them as test
+            # data set up by setUpTestData, and copy them for every test.
+            cls.get_class_step_handlers()
+
+            if cls.share_step_prefixes:
+                cls._shared_step_count = get_common_prefix_length(
+                    scenario.steps
+                    for scenario in cls('run_background').iter_expanded_scenarios()
+                )
+
+        super(TestCase, cls).setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TestCase, cls).setUpTestData()
+        if cls.background_runs_once():
+            cls.run_class_setup()
+
+    @classmethod
+    def background_runs_once(cls):
+        # Django < 1.8 has no setUpTestData.
+        return (cls.run_background_once or cls.share_step_prefixes) and hasattr(test.TestCase, 'setUpTestData')
+
+    def run_examples(self, scenarios, skip_step_count, title):
+        if not self.share_step_prefixes or len(scenarios) < 2:
+            return super(TestCase, self).run_examples(scenarios, skip_step_count, title)
+
+        # Rows are expanded as they're read, so only expand them once.
+        scenarios = list(scenarios)
+
+        # Run the steps every example row starts with once, then run the rest
+        # of each row from a savepoint, as if it were the only one.
+        prefix_length = max(
+            get_common_prefix_length(scenario.steps for scenario in scenarios),
+            skip_step_count
+        )
+        handlers = self.run_steps(scenarios[0].steps[skip_step_count:prefix_length], title)
+
+        example_handlers, success = super(TestCase, self).run_examples(scenarios, prefix_length, title)
+        return handlers + example_handlers, success
+
+    def run_example(self, scenario, skip_step_count, title):
+        if not self.share_step_prefixes:
+            return super(TestCase, self).run_example(scenario, skip_step_count, title)
+
+        with savepoint(self):
+            return super(TestCase, self).run_example(scenario, skip_step_count, title)
+
+@contextlib.contextmanager
+def no_context():
+    yield
+
+@contextlib.contextmanager
+def savepoint(test_case):
+    """
+    Roll back the test case's databases, and restore its attributes, on exit.
+    """
+
+    databases = getattr(test_case, 'databases', None) or [DEFAULT_DB_ALIAS]
+    if databases == '__all__':
+        databases = list(connections)
+
+    savepoint_ids = [
+        (alias, transaction.savepoint(using=alias))
+        for alias in sorted(databases)
+    ]
+    attributes = dict(vars(test_case))
+    try:
+        yield
+    finally:
+        for alias, savepoint_id in reversed(savepoint_ids):
+            transaction.savepoint_rollback(savepoint_id, using=alias)
+        vars(test_case).clear()
+        vars(test_case).update(attributes)
 
 class LiveServerTestCase(TestCaseMixin, test.LiveServerTestCase):
     pass
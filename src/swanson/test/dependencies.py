@@ -0,0 +1,83 @@
+import sys
+
+import six
+
+from swanson.files import get_file_hash, get_file_key, load_json, save_json
+
+def get_source_filename(filename):
+    # Point at the source, not the bytecode, so edits are noticed.
+    if filename.endswith(('.pyc', '.pyo')):
+        return filename[:-1]
+    return filename
+
+def get_scenario_dependencies(test, feature_filename, handlers):
+    """
+    The files a scenario's outcome depends on: its feature, its test module,
+    and the source files of the step handlers it matched.
+    """
+
+    filenames = set([feature_filename])
+
+    module = sys.modules.get(type(test).__module__)
+    if getattr(module, '__file__', None):
+        filenames.add(get_source_filename(module.__file__))
+
+    for handler in handlers:
+        filenames.add(get_source_filename(six.get_function_code(handler.func).co_filename))
+
+    return sorted(get_file_key(filename) for filename in filenames)
+
+class DependencyMap(object):
+    """
+    The files each passing scenario test depended on, with the hashes of
+    their contents when it ran, keyed by test ID.
+    """
+
+    def __init__(self, tests=None):
+        self._tests = dict(tests or {})
+        self._current_hashes = {}
+
+    @classmethod
+    def load(cls, filename):
+        return cls(load_json(filename))
+
+    def save(self, filename):
+        save_json(filename, self._tests)
+
+    def record(self, test_id, feature_key, scenario_title, file_keys):
+        self._tests[test_id] = {
+            'feature': feature_key,
+            'scenario': scenario_title,
+            'files': dict(
+                (file_key, self.get_current_hash(file_key))
+                for file_key in file_keys
+            )
+        }
+
+    def discard(self, test_id):
+        self._tests.pop(test_id, None)
+
+    def get(self, test_id):
+        return self._tests.get(test_id)
+
+    def is_changed(self, test_id):
+        """
+        Whether the test needs running: it's new, failed last time, or a file
+        it depends on has changed since it passed.
+        """
+
+        test = self._tests.get(test_id)
+        if test is None:
+            return True
+
+        return any(
+            file_hash is None or file_hash != self.get_current_hash(file_key)
+            for file_key, file_hash in six.iteritems(test['files'])
+        )
+
+    def get_current_hash(self, file_key):
+        try:
+            return self._current_hashes[file_key]
+        except KeyError:
+            file_hash = self._current_hashes[file_key] = get_file_hash(file_key)
+            return file_hash
@@ -0,0 +1,208 @@
+import json
+import os
+import os.path
+import shutil
+import tempfile
+import threading
+
+from swanson.handlers import get_handler_name
+from swanson.signals import post_example_test, post_feature_parse, post_scenario_test, post_step_test, pre_scenario_test
+from swanson.test.dependencies import get_scenario_dependencies
+
+ENVIRON_KEY = 'SWANSON_JOURNAL_DIR'
+ENVIRON_RECORDS_KEY = 'SWANSON_JOURNAL_RECORDS'
+
+# Records only written when the runner asks for them, as they cost time on
+# every step or scenario.
+STEP_RECORDS = 'steps'
+DEPENDENCY_RECORDS = 'dependencies'
+
+class MemoryJournal(object):
+    """
+    Records from a test run that happens entirely in this process.
+    """
+
+    def __init__(self):
+        self._records = []
+
+    def write(self, record_type, **data):
+        data['type'] = record_type
+        self._records.append(data)
+
+    def read(self, record_type=None):
+        for data in list(self._records):
+            if record_type is None or data['type'] == record_type:
+                yield data
+
+    def delete(self):
+        self._records = []
+
+class Journal(object):
+    """
+    Records from every process taking part in a test run - including parallel
+    workers - written to one file per process in a shared directory.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._fp = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls):
+        return cls(tempfile.mkdtemp(prefix='swanson-journal-'))
+
+    def write(self, record_type, **data):
+        data['type'] = record_type
+        line = '{}\n'.format(json.dumps(data, sort_keys=True))
+
+        with self._lock:
+            # Forked workers inherit the parent's file object, so check which
+            # process we're in.
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._fp = open(os.path.join(self.directory, '{}.jsonl'.format(self._pid)), 'a')
+
+            self._fp.write(line)
+            self._fp.flush()
+
+    def read(self, record_type=None):
+        for basename in sorted(os.listdir(self.directory)):
+            with open(os.path.join(self.directory, basename)) as fp:
+                for line in fp:
+                    data = json.loads(line)
+                    if record_type is None or data['type'] == record_type:
+                        yield data
+
+    def delete(self):
+        if self._fp is not None and self._pid == os.getpid():
+            self._fp.close()
+        self._fp = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+_active_journal = None
+_active_records = frozenset()
+_environ_journals = {}
+
+def get_journal():
+    """
+    The journal for the current test run, if the runner set one up.
+    """
+
+    if _active_journal is not None:
+        return _active_journal
+
+    # Workers started with the 'spawn' method only inherit the environment.
+    directory = os.environ.get(ENVIRON_KEY)
+    if not directory:
+        return None
+
+    try:
+        return _environ_journals[directory]
+    except KeyError:
+        journal = _environ_journals[directory] = Journal(directory)
+        return journal
+
+def is_recording(records):
+    """
+    Whether the runner asked for the optional `records`, e.g. STEP_RECORDS.
+    """
+
+    if _active_journal is not None:
+        return records in _active_records
+    return records in os.environ.get(ENVIRON_RECORDS_KEY, '').split(',')
+
+def activate(journal, records=()):
+    global _active_journal, _active_records
+    _active_journal = journal
+    _active_records = frozenset(records)
+    if isinstance(journal, Journal):
+        os.environ[ENVIRON_KEY] = journal.directory
+        os.environ[ENVIRON_RECORDS_KEY] = ','.join(sorted(_active_records))
+
+def deactivate(journal):
+    global _active_journal, _active_records
+    if _active_journal is journal:
+        _active_journal = None
+        _active_records = frozenset()
+    if isinstance(journal, Journal) and os.environ.get(ENVIRON_KEY) == journal.directory:
+        del os.environ[ENVIRON_KEY]
+        os.environ.pop(ENVIRON_RECORDS_KEY, None)
+
+def record_pre_scenario_test(sender, feature_filename, scenario_title, **kwargs):
+    journal = get_journal()
+    if journal is not None:
+        journal.write(
+            'scenario',
+            feature_filename=feature_filename,
+            scenario_title=scenario_title
+        )
+
+def record_post_scenario_test(sender, feature_filename, scenario_title, duration, success, handlers=(), **kwargs):
+    journal = get_journal()
+    if journal is not None:
+        journal.write(
+            'scenario_result',
+            feature_filename=feature_filename,
+            scenario_title=scenario_title,
+            duration=duration,
+            success=success,
+            test_id=sender.id(),
+            dependencies=(
+                get_scenario_dependencies(sender, feature_filename, handlers)
+                if is_recording(DEPENDENCY_RECORDS)
+                else None
+            )
+        )
+
+def record_post_step_test(sender, feature_filename, scenario_title, step, handler_match, match_duration, run_duration, success, **kwargs):
+    journal = get_journal()
+    if journal is not None and is_recording(STEP_RECORDS):
+        if handler_match is None:
+            handler = pattern = None
+        else:
+            handler = get_handler_name(handler_match.handler)
+            pattern = handler_match.matcher.regex.pattern
+
+        journal.write(
+            'step',
+            feature_filename=feature_filename,
+            scenario_title=scenario_title,
+            step=str(step),
+            line=step.index + 1,
+            handler=handler,
+            pattern=pattern,
+            match_duration=match_duration,
+            run_duration=run_duration,
+            success=success
+        )
+
+def record_post_example_test(sender, feature_filename, scenario_title, example_index, example, duration, success, **kwargs):
+    journal = get_journal()
+    if journal is not None and is_recording(STEP_RECORDS):
+        journal.write(
+            'example_result',
+            feature_filename=feature_filename,
+            scenario_title=scenario_title,
+            example_index=example_index,
+            example=example,
+            duration=duration,
+            success=success
+        )
+
+def record_post_feature_parse(sender, filename, duration, **kwargs):
+    journal = get_journal()
+    if journal is not None and is_recording(STEP_RECORDS):
+        journal.write(
+            'feature_parse',
+            filename=filename,
+            duration=duration
+        )
+
+def connect():
+    pre_scenario_test.connect(record_pre_scenario_test, dispatch_uid='swanson.test.journal.pre_scenario_test')
+    post_scenario_test.connect(record_post_scenario_test, dispatch_uid='swanson.test.journal.post_scenario_test')
+    post_step_test.connect(record_post_step_test, dispatch_uid='swanson.test.journal.post_step_test')
+    post_example_test.connect(record_post_example_test, dispatch_uid='swanson.test.journal.post_example_test')
+    post_feature_parse.connect(record_post_feature_parse, dispatch_uid='swanson.test.journal.post_feature_parse')
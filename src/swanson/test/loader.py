@@ -0,0 +1,138 @@
+"""
+Test cases built from feature files when a test module is imported, rather
+than generated by `bddgen` and written to disk:
+
+    # app/tests/test_features.py
+    import os.path
+
+    from swanson.test.loader import load_test_cases
+
+    globals().update(load_test_cases(
+        __name__,
+        [os.path.join(os.path.dirname(__file__), 'features')],
+        ['app.tests.steps']
+    ))
+"""
+
+import collections
+import importlib
+
+import six
+
+from swanson.codegen import CodeGen, DuplicateScenarioTitles, UniqueIdentifiers
+from swanson.discovery import FeatureIndex
+from swanson.handlers import StepHandler, StepHandlers
+from swanson.test.case import TestCase
+
+def get_module_step_handlers(module):
+    """
+    The step handlers in a step library module, by name. They're called
+    like methods of the test case, so take `self` and `step` arguments.
+    """
+
+    if isinstance(module, six.string_types):
+        module = importlib.import_module(module)
+
+    return collections.OrderedDict(
+        (name, value)
+        for name, value in sorted(six.iteritems(vars(module)))
+        if isinstance(value, StepHandler)
+    )
+
+def get_class_step_handlers(base, step_handlers):
+    # What TestCaseMixin.get_class_step_handlers finds on a subclass of
+    # `base` with `step_handlers` added.
+    members = dict((name, getattr(base, name)) for name in dir(base))
+    members.update(step_handlers)
+    return StepHandlers([
+        members[name]
+        for name in sorted(members)
+        if isinstance(members[name], StepHandler)
+    ])
+
+def create_test_method(name, title):
+    def test_method(self):
+        self.run_scenario(title)
+
+    test_method.__name__ = str(name)
+    test_method.__doc__ = title
+    return test_method
+
+def create_test_case(module_name, feature, step_handlers=None, base=TestCase, name=None,
+                     code_generator=CodeGen, class_step_handlers=None):
+    """
+    A test case class with a test method for each of `feature`'s scenarios,
+    named as `bddgen` would name it. `module_name` should be the module the
+    class is assigned to, so the test runner can find it by name.
+    """
+
+    step_handlers = dict(step_handlers or {})
+    member_identifiers = UniqueIdentifiers(step_handlers)
+
+    attrs = dict(step_handlers)
+    attrs.update({
+        '__module__': module_name,
+        '__doc__': feature.title,
+        'feature_filename': feature.filename,
+        '_step_handlers': (
+            class_step_handlers
+            if class_step_handlers is not None
+            else get_class_step_handlers(base, step_handlers)
+        )
+    })
+
+    seen_scenario_titles = set()
+    for scenario in feature.scenarios:
+        if scenario.title in seen_scenario_titles:
+            raise DuplicateScenarioTitles('Multiple scenarios named {!r}'.format(scenario.title))
+        seen_scenario_titles.add(scenario.title)
+
+        method_name = member_identifiers.get(code_generator.get_test_case_function_name(scenario))
+        attrs[method_name] = create_test_method(method_name, scenario.title)
+
+    return type(str(name or code_generator.get_test_case_name(feature)), (base,), attrs)
+
+def create_test_cases(module_name, features, step_modules=(), base=TestCase, code_generator=CodeGen):
+    """
+    Test case classes for `features`, by class name, each with the step
+    handlers of `step_modules`.
+    """
+
+    step_handlers = collections.OrderedDict()
+    for step_module in step_modules:
+        step_handlers.update(get_module_step_handlers(step_module))
+
+    # Every test case has the same handlers, so they share the matches found
+    # for each step.
+    class_step_handlers = get_class_step_handlers(base, step_handlers)
+
+    class_names = UniqueIdentifiers()
+    test_cases = collections.OrderedDict()
+    for feature in features:
+        name = class_names.get(code_generator.get_test_case_name(feature))
+        test_cases[name] = create_test_case(
+            module_name,
+            feature,
+            step_handlers,
+            base,
+            name,
+            code_generator,
+            class_step_handlers
+        )
+
+    return test_cases
+
+def load_test_cases(module_name, roots, step_modules=(), **kwargs):
+    """
+    Test case classes for every feature under `roots`. Features are parsed
+    through the feature cache, in worker processes if there are many.
+    """
+
+    from swanson import settings
+
+    feature_index = FeatureIndex(
+        roots,
+        settings.FEATURE_EXCLUDE,
+        processes=settings.FEATURE_PARSE_PROCESSES
+    )
+    return create_test_cases(module_name, feature_index.get_features(), step_modules, **kwargs)
@@ -0,0 +1,309 @@
+import collections
+import cProfile
+import errno
+import json
+import os
+import os.path
+import pstats
+import re
+
+import six
+
+from swanson.signals import post_scenario_test, pre_scenario_test
+from swanson.test.journal import get_journal
+
+ENVIRON_PATTERNS_KEY = 'SWANSON_PROFILE'
+ENVIRON_DIRECTORY_KEY = 'SWANSON_PROFILE_DIR'
+ENVIRON_PROFILER_KEY = 'SWANSON_PROFILER'
+
+class HandlerTimings(object):
+    __slots__ = ('handler', 'pattern', 'count', 'match_duration', 'run_duration', 'max_run_duration')
+
+    def __init__(self, handler, pattern):
+        self.handler = handler
+        self.pattern = pattern
+        self.count = 0
+        self.match_duration = 0.0
+        self.run_duration = 0.0
+        self.max_run_duration = 0.0
+
+    @property
+    def duration(self):
+        return self.match_duration + self.run_duration
+
+    def as_dict(self):
+        return {
+            'handler': self.handler,
+            'pattern': self.pattern,
+            'count': self.count,
+            'match_duration': self.match_duration,
+            'run_duration': self.run_duration,
+            'max_run_duration': self.max_run_duration
+        }
+
+class StepTimings(object):
+    """
+    Where a test run's time went: step matching and running, per step and per
+    step handler, and feature parsing.
+    """
+
+    def __init__(self, step_records=(), parse_records=(), example_records=()):
+        self.steps = []
+        self.examples = list(example_records)
+        self.handlers = collections.OrderedDict()
+        self.match_duration = 0.0
+        self.run_duration = 0.0
+        self.parse_count = 0
+        self.parse_duration = 0.0
+
+        for record in step_records:
+            self.add_step(record)
+        for record in parse_records:
+            self.add_parse(record)
+
+    @classmethod
+    def from_journal(cls, journal):
+        return cls(journal.read('step'), journal.read('feature_parse'), journal.read('example_result'))
+
+    def add_step(self, record):
+        self.steps.append(record)
+        self.match_duration += record['match_duration']
+        self.run_duration += record['run_duration']
+
+        key = (record['handler'], record['pattern'])
+        try:
+            handler_timings = self.handlers[key]
+        except KeyError:
+            handler_timings = self.handlers[key] = HandlerTimings(*key)
+
+        handler_timings.count += 1
+        handler_timings.match_duration += record['match_duration']
+        handler_timings.run_duration += record['run_duration']
+        handler_timings.max_run_duration = max(handler_timings.max_run_duration, record['run_duration'])
+
+    def add_parse(self, record):
+        self.parse_count += 1
+        self.parse_duration += record['duration']
+
+    def get_slowest_handlers(self, count=None):
+        handlers = sorted(
+            six.itervalues(self.handlers),
+            key=lambda handler_timings: handler_timings.duration,
+            reverse=True
+        )
+        return handlers[:count]
+
+    def get_slowest_steps(self, count=None):
+        steps = sorted(
+            self.steps,
+            key=lambda record: record['match_duration'] + record['run_duration'],
+            reverse=True
+        )
+        return steps[:count]
+
+    def get_slowest_examples(self, count=None):
+        examples = sorted(
+            self.examples,
+            key=lambda record: record['duration'],
+            reverse=True
+        )
+        return examples[:count]
+
+    def as_dict(self):
+        return {
+            'match_duration': self.match_duration,
+            'run_duration': self.run_duration,
+            'parse_count': self.parse_count,
+            'parse_duration': self.parse_duration,
+            'handlers': [
+                handler_timings.as_dict()
+                for handler_timings in self.get_slowest_handlers()
+            ],
+            'steps': self.get_slowest_steps(),
+            'examples': self.get_slowest_examples()
+        }
+
+    def save(self, filename):
+        with open(filename, 'w') as fp:
+            json.dump(self.as_dict(), fp, indent=2, sort_keys=True)
+
+    def format_report(self, count):
+        lines = [
+            'Step timings: {:.3f}s matching, {:.3f}s running {} steps; '
+            '{:.3f}s parsing {} features'.format(
+                self.match_duration,
+                self.run_duration,
+                len(self.steps),
+                self.parse_duration,
+                self.parse_count
+            ),
+            '',
+            'Slowest step handlers:'
+        ]
+        for handler_timings in self.get_slowest_handlers(count):
+            lines.append('  {:8.3f}s {:6} calls {:8.3f}s max  {}'.format(
+                handler_timings.duration,
+                handler_timings.count,
+                handler_timings.max_run_duration,
+                '{} ({!r})'.format(handler_timings.handler, handler_timings.pattern)
+                if handler_timings.handler else '<no handler>'
+            ))
+
+        lines.extend(['', 'Slowest steps:'])
+        for record in self.get_slowest_steps(count):
+            lines.append('  {:8.3f}s  {!r} on line {} of {}'.format(
+                record['match_duration'] + record['run_duration'],
+                record['step'],
+                record['line'],
+                os.path.relpath(record['feature_filename'])
+            ))
+
+        if self.examples:
+            lines.extend(['', 'Slowest example rows:'])
+            for record in self.get_slowest_examples(count):
+                lines.append('  {:8.3f}s  row {} of {!r} in {}'.format(
+                    record['duration'],
+                    record['example_index'] + 1,
+                    record['scenario_title'],
+                    os.path.relpath(record['feature_filename'])
+                ))
+
+        return '\n'.join(lines)
+
+class CProfiler(object):
+    extension = '.prof'
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def save(self, filename):
+        self._profile.dump_stats(filename)
+
+class PyinstrumentProfiler(object):
+    extension = '.html'
+
+    def __init__(self):
+        try:
+            import pyinstrument
+        except ImportError:
+            raise ImportError('pyinstrument must be installed to profile scenarios with it')
+        self._profiler = pyinstrument.Profiler()
+
+    def start(self):
+        self._profiler.start()
+
+    def stop(self):
+        self._profiler.stop()
+
+    def save(self, filename):
+        with open(filename, 'w') as fp:
+            fp.write(self._profiler.output_html())
+
+PROFILERS = {
+    'cprofile': CProfiler,
+    'pyinstrument': PyinstrumentProfiler
+}
+
+def activate(patterns, directory, profiler='cprofile'):
+    # Parallel workers may be spawned rather than forked, so pass everything
+    # through the environment.
+    os.environ[ENVIRON_PATTERNS_KEY] = json.dumps(list(patterns))
+    os.environ[ENVIRON_DIRECTORY_KEY] = directory
+    os.environ[ENVIRON_PROFILER_KEY] = profiler
+
+def deactivate():
+    for key in (ENVIRON_PATTERNS_KEY, ENVIRON_DIRECTORY_KEY, ENVIRON_PROFILER_KEY):
+        os.environ.pop(key, None)
+
+def get_patterns(test):
+    return list(test.profile_scenarios or ()) + json.loads(os.environ.get(ENVIRON_PATTERNS_KEY, '[]'))
+
+def get_directory():
+    directory = os.environ.get(ENVIRON_DIRECTORY_KEY)
+    if directory:
+        return directory
+
+    from swanson import settings
+    return settings.PROFILE_DIR
+
+def matches_patterns(scenario, patterns):
+    """
+    Whether a scenario is selected by any of `patterns`: tags such as
+    '@slow', or regexes searched for in its title.
+    """
+
+    tags = (scenario.feature.tags or []) + (scenario.tags or [])
+    for pattern in patterns:
+        if pattern.startswith('@'):
+            if pattern[1:] in tags:
+                return True
+        elif re.search(pattern, scenario.title):
+            return True
+    return False
+
+_profilers = {}
+
+def start_scenario_profile(sender, scenario_title, **kwargs):
+    patterns = get_patterns(sender)
+    if not patterns or not matches_patterns(sender.get_scenario(scenario_title), patterns):
+        return
+
+    profiler = PROFILERS[os.environ.get(ENVIRON_PROFILER_KEY, 'cprofile')]()
+    _profilers[id(sender)] = profiler
+    profiler.start()
+
+def stop_scenario_profile(sender, feature_filename, scenario_title, duration, **kwargs):
+    profiler = _profilers.pop(id(sender), None)
+    if profiler is None:
+        return
+
+    profiler.stop()
+
+    directory = get_directory()
+    try:
+        os.makedirs(directory)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            raise
+
+    filename = os.path.join(directory, '{}{}'.format(sender.id(), profiler.extension))
+    profiler.save(filename)
+
+    journal = get_journal()
+    if journal is not None:
+        journal.write(
+            'profile',
+            filename=filename,
+            feature_filename=feature_filename,
+            scenario_title=scenario_title,
+            duration=duration
+        )
+
+def save_slowest_profiles(records, count, filename):
+    """
+    Combine the cProfile profiles of the `count` slowest scenarios into one.
+    Returns the number of profiles combined.
+    """
+
+    filenames = [
+        record['filename']
+        for record in sorted(records, key=lambda record: record['duration'], reverse=True)
+        if record['filename'].endswith(CProfiler.extension)
+    ][:count]
+
+    if not filenames:
+        return 0
+
+    stats = pstats.Stats(*filenames)
+    stats.dump_stats(filename)
+    return len(filenames)
+
+def connect():
+    pre_scenario_test.connect(start_scenario_profile, dispatch_uid='swanson.test.profiling.pre_scenario_test')
+    post_scenario_test.connect(stop_scenario_profile, dispatch_uid='swanson.test.profiling.post_scenario_test')
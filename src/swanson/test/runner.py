@@ -1,12 +1,20 @@
 import collections
+import itertools
 import os
 import os.path
+import sys
 
+import six
 from django.test import TestCase, runner
 
-from swanson.data import Feature
+from swanson import settings
+from swanson.cache import get_feature_cache
+from swanson.discovery import get_feature_index
 from swanson.exceptions import UnimplementedScenariosError
-from swanson.signals import pre_scenario_test
+from swanson.files import get_file_key
+from swanson.options import add_options, get_option_list, option
+from swanson.test.case import TestCaseMixin
+from swanson.test import dependencies, journal, profiling, scheduling
 
 class UnimplementedBDDTestCase(TestCase):
     def __init__(self, methodName='test_unimplemented_feature', runner=None):
@@ -17,14 +25,16 @@ class UnimplementedBDDTestCase(TestCase):
         if not self.runner:
             raise Exception('Test runner not set')
 
+        implemented_scenarios = self.runner.get_implemented_scenarios()
+
         unimplemented = collections.defaultdict(list)
-        for feature_filename in self.iter_feature_filenames('.'):
-            feature_filename = os.path.abspath(feature_filename)
-            feature = Feature.from_filename(feature_filename)
+        for feature in get_feature_index().get_features():
+            if not self.runner.is_in_shard(get_file_key(feature.filename)):
+                continue
 
             for scenario in feature.scenarios:
-                if scenario.title not in self.runner.implemented_scenarios[feature_filename]:
-                    unimplemented[feature_filename].append(scenario.title)
+                if scenario.title not in implemented_scenarios[feature.filename]:
+                    unimplemented[feature.filename].append(scenario.title)
 
         if unimplemented:
             raise UnimplementedScenariosError('\n{}'.format('\n'.join(
@@ -35,32 +45,313 @@ class UnimplementedBDDTestCase(TestCase):
                         for scenario_title in scenario_titles
                     )
                 )
-                for feature_filename, scenario_titles in sorted(unimplemented.iteritems())
+                for feature_filename, scenario_titles in sorted(six.iteritems(unimplemented))
             )))
 
-    def iter_feature_filenames(self, path):
-        for path, _, basenames in os.walk(path):
-            for basename in basenames:
-                if basename.endswith('.feature'):
-                    yield os.path.join(path, basename)
+if hasattr(runner, 'ParallelTestSuite'):
+    class ParallelTestSuite(runner.ParallelTestSuite):
+        """
+        Runs tests in worker processes, then runs `serial_tests` in this
+        process once every worker has finished.
+        """
+
+        def __init__(self, *args, **kwargs):
+            super(ParallelTestSuite, self).__init__(*args, **kwargs)
+            self.serial_tests = []
+
+        def run(self, result):
+            result = super(ParallelTestSuite, self).run(result)
+            for test in self.serial_tests:
+                if result.shouldStop:
+                    break
+                test(result)
+            return result
+
+        def __iter__(self):
+            return itertools.chain(self.subsuites, self.serial_tests)
+else:
+    # Django < 1.9 doesn't run tests in parallel.
+    ParallelTestSuite = None
+
+# The test command's options, added to Django's.
+RUNNER_OPTIONS = (
+    option(
+        '--shard-index', type=int,
+        help='Run only this shard of the tests, from 0 to --shard-count minus 1.'
+    ),
+    option(
+        '--shard-count', type=int,
+        help='Split the tests into this many shards, e.g. one per CI node. '
+             'Features are never split between shards.'
+    ),
+    option(
+        '--timings-file',
+        help='Record how long each scenario takes in this file, and use '
+             'previous timings to balance shards and parallel workers.'
+    ),
+    option(
+        '--changed-since', metavar='DEPENDENCY_FILE',
+        help='Only run scenarios whose feature, step handlers or test '
+             'module changed since they last passed, as recorded in this file.'
+    ),
+    option(
+        '--slowest-steps', type=int, metavar='N',
+        help='Report the N slowest step handlers and steps.'
+    ),
+    option(
+        '--step-report-file',
+        help='Write step, step handler and feature parsing timings to this '
+             'file as JSON.'
+    ),
+    option(
+        '--profile', action='append', metavar='PATTERN',
+        help='Profile scenarios tagged with PATTERN, if it starts with @, '
+             'or whose titles match the regex PATTERN. Can be repeated.'
+    ),
+    option(
+        '--profile-dir',
+        help='Directory to write one profile per scenario to.'
+    ),
+    option(
+        '--profiler', choices=sorted(profiling.PROFILERS),
+        help='Profiler to use. Defaults to cprofile.'
+    ),
+    option(
+        '--profile-slowest', type=int, metavar='N',
+        help='Combine the cProfile profiles of the N slowest profiled '
+             'scenarios into slowest.prof in the profile directory.'
+    )
+)
 
 class TestRunnerMixin(object):
     def __init__(self, *args, **kwargs):
+        self.shard_index = kwargs.pop('shard_index', None)
+        self.shard_count = kwargs.pop('shard_count', None)
+        self.timings_file = kwargs.pop('timings_file', None) or settings.TIMINGS_FILE
+        self.dependency_file = kwargs.pop('changed_since', None)
+        self.slowest_steps = kwargs.pop('slowest_steps', None)
+        self.step_report_file = kwargs.pop('step_report_file', None)
+        self.profile_patterns = kwargs.pop('profile', None) or []
+        self.profile_dir = kwargs.pop('profile_dir', None) or settings.PROFILE_DIR
+        self.profiler = kwargs.pop('profiler', None) or 'cprofile'
+        self.profile_slowest = kwargs.pop('profile_slowest', None)
+
+        if (self.shard_index is None) != (self.shard_count is None):
+            raise ValueError('--shard-index and --shard-count must be used together')
+        if self.shard_count is not None and not 0 <= self.shard_index < self.shard_count:
+            raise ValueError('--shard-index must be between 0 and {}'.format(self.shard_count - 1))
+
         super(TestRunnerMixin, self).__init__(*args, **kwargs)
-        pre_scenario_test.connect(self.pre_scenario_test)
 
-    def pre_scenario_test(self, feature_filename, scenario_title, **kwargs):
-        self.implemented_scenarios[feature_filename].add(scenario_title)
+        self.journal = None
+        self.timings = None
+        self.shard_assignments = None
+        self.dependency_map = None
+        self.unchanged_scenarios = []
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super(TestRunnerMixin, cls).add_arguments(parser)
+        add_options(parser, RUNNER_OPTIONS)
+
+    def get_journal_records(self):
+        records = []
+        if self.slowest_steps or self.step_report_file:
+            records.append(journal.STEP_RECORDS)
+        if self.dependency_map is not None:
+            records.append(journal.DEPENDENCY_RECORDS)
+        return records
+
+    def get_implemented_scenarios(self):
+        implemented_scenarios = collections.defaultdict(set)
+        for record in self.journal.read('scenario'):
+            implemented_scenarios[os.path.abspath(record['feature_filename'])].add(record['scenario_title'])
+        for feature_key, scenario_title in self.unchanged_scenarios:
+            implemented_scenarios[os.path.abspath(feature_key)].add(scenario_title)
+        return implemented_scenarios
 
     def run_tests(self, test_labels, extra_tests=None, **kwargs):
-        self.implemented_scenarios = collections.defaultdict(set)
-        return super(TestRunnerMixin, self).run_tests(test_labels, extra_tests, **kwargs)
+        # Parallel workers can't send signals back to this process, so what
+        # they run is recorded in an on-disk journal instead.
+        if getattr(self, 'parallel', 1) > 1:
+            self.journal = journal.Journal.create()
+        else:
+            self.journal = journal.MemoryJournal()
+        if self.timings_file:
+            self.timings = scheduling.Timings.load(self.timings_file)
+        if self.dependency_file:
+            self.dependency_map = dependencies.DependencyMap.load(self.dependency_file)
+
+        journal.connect()
+        journal.activate(self.journal, self.get_journal_records())
+
+        profiling.connect()
+        if self.profile_patterns:
+            profiling.activate(self.profile_patterns, self.profile_dir, self.profiler)
+
+        try:
+            result = super(TestRunnerMixin, self).run_tests(test_labels, extra_tests, **kwargs)
+
+            if self.timings_file:
+                self.save_timings()
+            if self.dependency_file:
+                self.save_dependency_map()
+            if self.slowest_steps or self.step_report_file:
+                self.report_step_timings()
+            if self.profile_slowest:
+                self.save_slowest_profiles()
+        finally:
+            profiling.deactivate()
+            journal.deactivate(self.journal)
+            self.journal.delete()
+
+        if self.verbosity >= 2:
+            cache_info = get_feature_cache().info()
+            sys.stderr.write('Feature cache: {} hits, {} misses\n'.format(
+                cache_info.hits,
+                cache_info.misses
+            ))
+
+        return result
+
+    def save_timings(self):
+        for record in self.journal.read('scenario_result'):
+            if record['success']:
+                self.timings.record(
+                    get_file_key(record['feature_filename']),
+                    record['scenario_title'],
+                    record['duration']
+                )
+
+        self.timings.save(self.timings_file)
+
+    def report_step_timings(self):
+        step_timings = profiling.StepTimings.from_journal(self.journal)
+        if self.slowest_steps:
+            sys.stderr.write('\n{}\n'.format(step_timings.format_report(self.slowest_steps)))
+        if self.step_report_file:
+            step_timings.save(self.step_report_file)
+
+    def save_slowest_profiles(self):
+        filename = os.path.join(self.profile_dir, 'slowest.prof')
+        count = profiling.save_slowest_profiles(self.journal.read('profile'), self.profile_slowest, filename)
+        if count:
+            sys.stderr.write('Combined profiles of the {} slowest scenarios in {}\n'.format(count, filename))
+
+    def save_dependency_map(self):
+        for record in self.journal.read('scenario_result'):
+            if record['success']:
+                self.dependency_map.record(
+                    record['test_id'],
+                    get_file_key(record['feature_filename']),
+                    record['scenario_title'],
+                    record['dependencies']
+                )
+            else:
+                self.dependency_map.discard(record['test_id'])
+
+        self.dependency_map.save(self.dependency_file)
 
     def build_suite(self, test_labels=None, extra_tests=None, **kwargs):
         suite = super(TestRunnerMixin, self).build_suite(test_labels, extra_tests, **kwargs)
+
+        is_parallel = ParallelTestSuite is not None and isinstance(suite, ParallelTestSuite)
+
+        if self.dependency_map is not None:
+            suite = self.filter_suite(suite, self.is_changed, is_parallel)
+
+        if self.shard_count is not None:
+            if self.timings is not None:
+                self.shard_assignments = scheduling.pack(
+                    self.get_estimated_durations(scheduling.iter_tests(suite)),
+                    self.shard_count
+                )
+
+            def in_shard(test):
+                return self.is_in_shard(scheduling.get_test_key(test))
+
+            suite = self.filter_suite(suite, in_shard, is_parallel)
+
+        if is_parallel:
+            suite.subsuites = self.order_subsuites(suite.subsuites)
+
         if not test_labels:
-            suite.addTest(UnimplementedBDDTestCase(runner=self))
+            # Must run after every scenario, so never in a parallel worker.
+            if is_parallel:
+                suite.serial_tests.append(UnimplementedBDDTestCase(runner=self))
+            else:
+                suite.addTest(UnimplementedBDDTestCase(runner=self))
+
+        return suite
+
+    def filter_suite(self, suite, predicate, is_parallel):
+        if not is_parallel:
+            return scheduling.filter_suite(suite, predicate, self.test_suite)
+
+        suite.subsuites = [
+            subsuite
+            for subsuite in (
+                scheduling.filter_suite(subsuite, predicate, self.test_suite)
+                for subsuite in suite.subsuites
+            )
+            if subsuite.countTestCases()
+        ]
         return suite
 
+    def is_changed(self, test):
+        # Only scenarios are tracked, so always run everything else.
+        if not isinstance(test, TestCaseMixin):
+            return True
+
+        if self.dependency_map.is_changed(test.id()):
+            return True
+
+        dependency = self.dependency_map.get(test.id())
+        self.unchanged_scenarios.append((dependency['feature'], dependency['scenario']))
+        return False
+
+    def get_estimated_durations(self, tests):
+        test_counts = collections.Counter(
+            scheduling.get_test_key(test)
+            for test in tests
+        )
+
+        timings = self.timings or scheduling.Timings()
+        default_duration = timings.get_default_duration()
+        return dict(
+            (key, timings.estimate(key, test_count, default_duration))
+            for key, test_count in six.iteritems(test_counts)
+        )
+
+    def is_in_shard(self, key):
+        if self.shard_count is None:
+            return True
+
+        # Keys without tests, e.g. unimplemented features, aren't packed.
+        if self.shard_assignments is not None and key in self.shard_assignments:
+            return self.shard_assignments[key] == self.shard_index
+
+        return scheduling.get_shard_index(key, self.shard_count) == self.shard_index
+
+    def order_subsuites(self, subsuites):
+        # Each subsuite is a single test case class - normally one feature.
+        # Workers take the next subsuite as they become free, so starting with
+        # the longest stops a slow feature holding up the end of the run.
+        durations = self.get_estimated_durations(
+            test
+            for subsuite in subsuites
+            for test in scheduling.iter_tests(subsuite)
+        )
+
+        def get_duration(subsuite):
+            return durations[scheduling.get_test_key(next(scheduling.iter_tests(subsuite)))]
+
+        return sorted(subsuites, key=get_duration, reverse=True)
+
 class DiscoverRunner(TestRunnerMixin, runner.DiscoverRunner):
-    pass
+    if ParallelTestSuite is not None:
+        parallel_test_suite = ParallelTestSuite
+
+    if not hasattr(runner.DiscoverRunner, 'add_arguments'):
+        # Django < 1.8 takes optparse options.
+        option_list = runner.DiscoverRunner.option_list + get_option_list(RUNNER_OPTIONS)
@@ -0,0 +1,102 @@
+import collections
+import hashlib
+import heapq
+import unittest
+
+import six
+
+from swanson.files import get_file_key, load_json, save_json
+from swanson.test.case import TestCaseMixin
+
+# Estimated duration of a scenario, in seconds, when nothing has been
+# recorded yet.
+DEFAULT_DURATION = 1.0
+
+def get_test_key(test):
+    """
+    The unit tests are scheduled in: the feature file for BDD tests, the test
+    case class otherwise. A unit is never split between shards or workers.
+    """
+
+    if isinstance(test, TestCaseMixin):
+        return get_file_key(test.get_feature_filename())
+    else:
+        return '{}.{}'.format(type(test).__module__, type(test).__name__)
+
+def get_shard_index(key, shard_count):
+    # Python's hash() is randomised per process, so use a stable digest.
+    digest = hashlib.md5(key.encode('utf8')).hexdigest()
+    return int(digest, 16) % shard_count
+
+def iter_tests(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            for sub_test in iter_tests(test):
+                yield sub_test
+        else:
+            yield test
+
+def filter_suite(suite, predicate, suite_cls=unittest.TestSuite):
+    return suite_cls([
+        test
+        for test in iter_tests(suite)
+        if predicate(test)
+    ])
+
+def pack(durations, bin_count):
+    """
+    Assign keys to bins, longest duration first, each going to the bin with
+    the least work so far. Returns a dict of key to bin index.
+    """
+
+    bins = [(0.0, index) for index in six.moves.range(bin_count)]
+    assignments = {}
+    for key, duration in sorted(six.iteritems(durations), key=lambda item: (-item[1], item[0])):
+        total, index = heapq.heappop(bins)
+        assignments[key] = index
+        heapq.heappush(bins, (total + duration, index))
+    return assignments
+
+class Timings(object):
+    """
+    Scenario wall times from previous runs, keyed by feature and scenario
+    title.
+    """
+
+    def __init__(self, durations=None):
+        self._durations = collections.defaultdict(dict)
+        for feature_key, scenario_durations in six.iteritems(durations or {}):
+            self._durations[feature_key].update(scenario_durations)
+
+    @classmethod
+    def load(cls, filename):
+        return cls(load_json(filename))
+
+    def save(self, filename):
+        save_json(filename, self._durations)
+
+    def record(self, feature_key, scenario_title, duration):
+        self._durations[feature_key][scenario_title] = duration
+
+    def get_default_duration(self):
+        durations = sorted(
+            duration
+            for scenario_durations in six.itervalues(self._durations)
+            for duration in six.itervalues(scenario_durations)
+        )
+        if not durations:
+            return DEFAULT_DURATION
+        return durations[len(durations) // 2]
+
+    def estimate(self, key, test_count, default_duration=None):
+        """
+        Estimated duration of `test_count` tests, using what's recorded for
+        the feature `key`, and `default_duration` for anything else.
+        """
+
+        if default_duration is None:
+            default_duration = self.get_default_duration()
+
+        known_durations = sorted(six.itervalues(self._durations.get(key, {})), reverse=True)
+        known_durations = known_durations[:test_count]
+        return sum(known_durations) + default_duration * (test_count - len(known_durations))
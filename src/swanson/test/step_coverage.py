@@ -0,0 +1,158 @@
+import collections
+import os.path
+
+from swanson.cache import get_feature
+from swanson.codegen import CodeGen
+from swanson.files import get_file_key
+from swanson.handlers import get_handler_name
+from swanson.test.case import TestCaseMixin
+from swanson.test.scheduling import iter_tests
+
+def iter_test_cases(suite):
+    # One test from each BDD test case class.
+    seen_classes = set()
+    for test in iter_tests(suite):
+        if isinstance(test, TestCaseMixin) and type(test) not in seen_classes:
+            seen_classes.add(type(test))
+            yield test
+
+def get_test_case_name(test):
+    return '{}.{}'.format(type(test).__module__, type(test).__name__)
+
+class StepCoverage(object):
+    """
+    Which steps of their features test cases have handlers for, found by
+    matching every step without running any.
+    """
+
+    def __init__(self):
+        self.undefined = []
+        self.ambiguous = []
+        self.step_count = 0
+        self._handlers = collections.OrderedDict()
+        self._used_handlers = set()
+        # Test cases with the same step handlers share the matches found for
+        # each distinct step.
+        self._handler_matches = {}
+
+    @classmethod
+    def from_suite(cls, suite):
+        coverage = cls()
+        for test in iter_test_cases(suite):
+            feature_filename = test.get_feature_filename()
+            if os.path.isfile(feature_filename):
+                coverage.add_test_case(test, get_feature(feature_filename))
+        return coverage
+
+    def add_test_case(self, test, feature):
+        test_case_name = get_test_case_name(test)
+        step_handlers = test.get_step_handlers()
+        for handler in step_handlers:
+            self._handlers.setdefault(handler, None)
+
+        try:
+            handler_matches = self._handler_matches[tuple(step_handlers)]
+        except KeyError:
+            handler_matches = self._handler_matches[tuple(step_handlers)] = {}
+
+        # Outline rows repeat their steps, so each is only reported once.
+        reported_keys = set()
+        for step in CodeGen.iter_feature_steps(feature):
+            self.step_count += 1
+
+            key = (step.clause, step.title)
+            try:
+                matches = handler_matches[key]
+            except KeyError:
+                matches = handler_matches[key] = step_handlers.find_handler_matches_for_step(step)
+                self._used_handlers.update(handler_match.handler for handler_match in matches)
+
+            if len(matches) == 1 or key in reported_keys:
+                continue
+            reported_keys.add(key)
+
+            record = {
+                'test_case': test_case_name,
+                'feature_filename': get_file_key(feature.filename),
+                'line': step.index + 1,
+                'step': str(step)
+            }
+            if matches:
+                record['handlers'] = [
+                    {
+                        'handler': get_handler_name(handler_match.handler),
+                        'pattern': handler_match.matcher.regex.pattern
+                    }
+                    for handler_match in matches
+                ]
+                self.ambiguous.append(record)
+            else:
+                self.undefined.append(record)
+
+    @property
+    def handler_count(self):
+        return len(self._handlers)
+
+    def get_unused_handlers(self):
+        return [
+            {
+                'handler': get_handler_name(handler),
+                'patterns': [matcher.regex.pattern for matcher in handler.matchers]
+            }
+            for handler in self._handlers
+            if handler not in self._used_handlers
+        ]
+
+    def as_dict(self):
+        return {
+            'step_count': self.step_count,
+            'handler_count': self.handler_count,
+            'undefined': self.undefined,
+            'ambiguous': self.ambiguous,
+            'unused': self.get_unused_handlers()
+        }
+
+    def format_report(self):
+        unused = self.get_unused_handlers()
+        lines = [
+            'Matched {} steps against {} step handlers: {} undefined, {} ambiguous, '
+            '{} handlers unused'.format(
+                self.step_count,
+                self.handler_count,
+                len(self.undefined),
+                len(self.ambiguous),
+                len(unused)
+            )
+        ]
+
+        if self.undefined:
+            lines.extend(['', 'Undefined steps:'])
+            for record in self.undefined:
+                lines.append('  {!r} on line {} of {} ({})'.format(
+                    record['step'],
+                    record['line'],
+                    record['feature_filename'],
+                    record['test_case']
+                ))
+
+        if self.ambiguous:
+            lines.extend(['', 'Ambiguous steps:'])
+            for record in self.ambiguous:
+                lines.append('  {!r} on line {} of {} ({})'.format(
+                    record['step'],
+                    record['line'],
+                    record['feature_filename'],
+                    record['test_case']
+                ))
+                for handler in record['handlers']:
+                    lines.append('    {} ({!r})'.format(handler['handler'], handler['pattern']))
+
+        if unused:
+            lines.extend(['', 'Unused step handlers:'])
+            for handler in unused:
+                lines.append('  {} ({})'.format(
+                    handler['handler'],
+                    ', '.join(repr(pattern) for pattern in handler['patterns'])
+                ))
+
+        return '\n'.join(lines)
@@ -0,0 +1,7 @@
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+if hasattr(django, 'setup'):
+    django.setup()
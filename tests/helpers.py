@@ -0,0 +1,31 @@
+import os
+import shutil
+import tempfile
+
+FEATURE = u"""
+Feature: {}
+    Scenario: Scenario title
+        Given a step
+"""
+
+def write_feature(filename, title, source=FEATURE):
+    directory = os.path.dirname(filename)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(filename, 'w') as fp:
+        fp.write(source.format(title))
+    return filename
+
+class FeatureDirectoryMixin(object):
+    """
+    Creates feature files in a temporary directory, removed after each test.
+    """
+
+    def setUp(self):
+        super(FeatureDirectoryMixin, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def create_feature(self, relpath, title=None, source=FEATURE):
+        filename = os.path.join(self.directory, *relpath.split('/'))
+        return write_feature(filename, relpath if title is None else title, source)
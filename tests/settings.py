@@ -0,0 +1,10 @@
+SECRET_KEY = 'swanson-tests'
+
+INSTALLED_APPS = ['swanson']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:'
+    }
+}
@@ -0,0 +1,54 @@
+import os
+import unittest
+
+from swanson.cache import FeatureCache
+
+from tests.helpers import FeatureDirectoryMixin
+
+class FeatureCacheTestCase(FeatureDirectoryMixin, unittest.TestCase):
+    def test_hit(self):
+        cache = FeatureCache()
+        filename = self.create_feature('a.feature', 'Feature title')
+
+        feature = cache.get(filename)
+        self.assertEqual(feature.title, 'Feature title')
+        self.assertIs(cache.get(filename), feature)
+
+        self.assertEqual(cache.info(), (1, 1, 128, 1))
+
+    def test_invalidated_by_stat(self):
+        cache = FeatureCache()
+        filename = self.create_feature('a.feature', 'Feature title')
+        cache.get(filename)
+
+        self.create_feature('a.feature', 'Changed feature title')
+        os.utime(filename, (0, 0))
+
+        self.assertEqual(cache.get(filename).title, 'Changed feature title')
+        self.assertEqual(cache.info().misses, 2)
+
+    def test_least_recently_used_evicted(self):
+        cache = FeatureCache(max_size=2)
+        filename_a = self.create_feature('a.feature', 'A')
+        filename_b = self.create_feature('b.feature', 'B')
+        filename_c = self.create_feature('c.feature', 'C')
+
+        cache.get(filename_a)
+        cache.get(filename_b)
+        cache.get(filename_a)
+        cache.get(filename_c)
+
+        self.assertEqual(cache.info(), (1, 3, 2, 2))
+
+        cache.get(filename_a)
+        self.assertEqual(cache.info().hits, 2)
+
+        cache.get(filename_b)
+        self.assertEqual(cache.info().misses, 4)
+
+    def test_disabled(self):
+        cache = FeatureCache(max_size=0)
+        filename = self.create_feature('a.feature', 'Feature title')
+
+        self.assertIsNot(cache.get(filename), cache.get(filename))
+        self.assertEqual(cache.info(), (0, 2, 0, 0))
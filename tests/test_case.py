@@ -0,0 +1,403 @@
+import unittest
+
+from django import test
+from django.db import connection
+
+from swanson.data import Feature
+from swanson.decorators import given, then, when
+from swanson.exceptions import StepError
+from swanson.signals import post_scenario_test, post_step_test, pre_step_test
+from swanson.test.case import TestCase, TestCaseMixin
+
+class StepLibrary(object):
+    @given(r'^library step$')
+    def given_library_step(self, step):
+        pass
+
+class ParentTestCase(TestCaseMixin, unittest.TestCase):
+    @given(r'^parent step$')
+    def given_parent_step(self, step):
+        pass
+
+    def test_example(self):
+        pass
+
+class ChildTestCase(StepLibrary, ParentTestCase):
+    @when(r'^child step$')
+    def when_child_step(self, step):
+        pass
+
+class StepHandlersTestCase(unittest.TestCase):
+    def test_collected_once_per_class(self):
+        step_handlers = ParentTestCase('test_example').get_step_handlers()
+        self.assertIs(ParentTestCase('test_example').get_step_handlers(), step_handlers)
+        self.assertIs(ParentTestCase.get_class_step_handlers(), step_handlers)
+
+    def test_inherited_handlers(self):
+        self.assertEqual(
+            self.get_handler_funcs(ParentTestCase),
+            ['given_parent_step']
+        )
+
+        self.assertEqual(
+            self.get_handler_funcs(ChildTestCase),
+            ['given_library_step', 'given_parent_step', 'when_child_step']
+        )
+
+    def get_handler_funcs(self, cls):
+        return [
+            handler.func.__name__
+            for handler in cls.get_class_step_handlers()
+        ]
+
+class ScenarioTestCase(TestCaseMixin, unittest.TestCase):
+    feature = Feature.from_string(u"""
+Feature: Example
+    Background:
+        Given a background step
+
+    Scenario: Passing
+        Given parent step
+        Then a passing step
+
+    Scenario: Failing
+        Given parent step
+        Then a failing step
+""")
+
+    @given(r'^a background step$')
+    def given_background_step(self, step):
+        self.background_count = getattr(self, 'background_count', 0) + 1
+
+    @given(r'^parent step$')
+    def given_parent_step(self, step):
+        pass
+
+    @then(r'^a passing step$')
+    def then_passing_step(self, step):
+        pass
+
+    @then(r'^a failing step$')
+    def then_failing_step(self, step):
+        raise AssertionError('Failed')
+
+    def get_feature(self):
+        return self.feature
+
+    def test_example(self):
+        pass
+
+class StepSignalsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.received = []
+        pre_step_test.connect(self.receive_pre_step_test)
+        post_step_test.connect(self.receive_post_step_test)
+        self.addCleanup(pre_step_test.disconnect, self.receive_pre_step_test)
+        self.addCleanup(post_step_test.disconnect, self.receive_post_step_test)
+
+    def receive_pre_step_test(self, sender, scenario_title, step, **kwargs):
+        self.received.append(('pre', scenario_title, str(step)))
+
+    def receive_post_step_test(self, sender, scenario_title, step, handler_match, match_duration, run_duration, success, **kwargs):
+        self.assertGreaterEqual(match_duration, 0)
+        self.assertGreaterEqual(run_duration, 0)
+        self.received.append(('post', scenario_title, str(step), handler_match.handler.func.__name__, success))
+
+    def test_passing(self):
+        ScenarioTestCase('test_example').run_scenario('Passing')
+        self.assertEqual(self.received, [
+            ('pre', 'Passing', 'Given a background step'),
+            ('post', 'Passing', 'Given a background step', 'given_background_step', True),
+            ('pre', 'Passing', 'Given parent step'),
+            ('post', 'Passing', 'Given parent step', 'given_parent_step', True),
+            ('pre', 'Passing', 'Then a passing step'),
+            ('post', 'Passing', 'Then a passing step', 'then_passing_step', True)
+        ])
+
+    def test_failing(self):
+        with self.assertRaises(StepError):
+            ScenarioTestCase('test_example').run_scenario('Failing')
+        self.assertEqual(self.received[-1], ('post', 'Failing', 'Then a failing step', 'then_failing_step', False))
+
+class BackgroundTestCase(unittest.TestCase):
+    def test_run_class_background(self):
+        class OnceTestCase(ScenarioTestCase):
+            pass
+
+        OnceTestCase.run_class_setup()
+        self.assertEqual(OnceTestCase.background_count, 1)
+        self.assertEqual(OnceTestCase('test_example').background_count, 1)
+        self.assertFalse(hasattr(ScenarioTestCase, 'background_count'))
+
+    def test_run_class_shared_steps_after_empty_outline(self):
+        class SharedTestCase(TestCaseMixin, unittest.TestCase):
+            feature = Feature.from_string(u"""
+Feature: Example
+    Scenario Outline: No rows
+        Given a shared step
+        Then <n> apples
+
+        Examples:
+            | n |
+
+    Scenario: Plain
+        Given a shared step
+        Then a passing step
+""")
+            _shared_step_count = 1
+
+            @given(r'^a shared step$')
+            def given_shared_step(self, step):
+                self.shared_count = getattr(self, 'shared_count', 0) + 1
+
+            def get_feature(self):
+                return self.feature
+
+            def test_example(self):
+                pass
+
+        SharedTestCase.run_class_setup()
+        self.assertEqual(SharedTestCase.shared_count, 1)
+
+class Client(object):
+    def __init__(self):
+        self.cookies = {}
+
+class ClientTestCase(TestCaseMixin, unittest.TestCase):
+    client_class = Client
+
+    feature = Feature.from_string(u"""
+Feature: Example
+    Background:
+        Given I am logged in
+
+    Scenario: Logged in
+        Then I am logged in
+""")
+
+    @classmethod
+    def background_runs_once(cls):
+        return True
+
+    @given(r'^I am logged in$')
+    def given_logged_in(self, step):
+        self.client.cookies['sessionid'] = 'session'
+
+    @then(r'^I am logged in$')
+    def then_logged_in(self, step):
+        self.assertEqual(self.client.cookies.get('sessionid'), 'session')
+
+    def get_feature(self):
+        return self.feature
+
+    def setUp(self):
+        # As Django does for each test.
+        self.client = self.client_class()
+
+    def run_logged_in(self):
+        self.run_scenario('Logged in')
+
+class BackgroundClientTestCase(unittest.TestCase):
+    def test_background_uses_client(self):
+        ClientTestCase.run_class_setup()
+        self.assertFalse(hasattr(ClientTestCase, 'client'))
+
+        result = unittest.TestResult()
+        ClientTestCase('run_logged_in').run(result)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.failures, [])
+
+    def test_class_setup_handlers_reported_with_scenarios(self):
+        class OnceClientTestCase(ClientTestCase):
+            pass
+
+        OnceClientTestCase.run_class_setup()
+
+        received = []
+        def receive_post_scenario_test(sender, handlers, **kwargs):
+            received.append(sorted(handler.func.__name__ for handler in handlers))
+        post_scenario_test.connect(receive_post_scenario_test)
+        self.addCleanup(post_scenario_test.disconnect, receive_post_scenario_test)
+
+        test_case = OnceClientTestCase('run_logged_in')
+        test_case.setUp()
+        test_case.run_logged_in()
+        self.assertEqual(received, [['given_logged_in', 'then_logged_in']])
+
+class OutlineTestCase(TestCaseMixin, unittest.TestCase):
+    feature = Feature.from_string(u"""
+Feature: Example
+    Scenario Outline: Rows
+        Given <n> apples
+        Then there are <expected> apples
+
+        Examples:
+            | n | expected |
+            | 1 | 1        |
+            | 2 | 3        |
+            | 3 | 3        |
+            | 4 | 5        |
+""")
+
+    @given(r'^(\d+) apples$')
+    def given_apples(self, step, n):
+        self.apples = int(n)
+
+    @then(r'^there are (\d+) apples$')
+    def then_apples(self, step, n):
+        self.rows.append(self.apples)
+        self.assertEqual(self.apples, int(n))
+
+    def get_feature(self):
+        return self.feature
+
+    def setUp(self):
+        self.rows = []
+
+    def run_rows(self):
+        self.run_scenario('Rows')
+
+class StopAtFirstFailingExampleTestCase(OutlineTestCase):
+    stop_at_first_failing_example = True
+
+@unittest.skipUnless(hasattr(unittest.TestCase, 'subTest'), 'Requires subTest')
+class ExampleSubTestsTestCase(unittest.TestCase):
+    def test_failing_rows_reported_as_subtests(self):
+        scenario_results = []
+        def receive_post_scenario_test(sender, success, **kwargs):
+            scenario_results.append(success)
+        post_scenario_test.connect(receive_post_scenario_test)
+        self.addCleanup(post_scenario_test.disconnect, receive_post_scenario_test)
+
+        test_case = OutlineTestCase('run_rows')
+        result = unittest.TestResult()
+        test_case.run(result)
+
+        self.assertEqual(scenario_results, [False])
+        self.assertEqual(test_case.rows, [1, 2, 3, 4])
+        self.assertEqual(
+            [failed_test.params['example'] for failed_test, _ in result.errors],
+            [2, 4]
+        )
+
+    def test_stop_at_first_failing_example(self):
+        test_case = StopAtFirstFailingExampleTestCase('run_rows')
+        result = unittest.TestResult()
+        test_case.run(result)
+
+        self.assertEqual(test_case.rows, [1, 2])
+        self.assertEqual(len(result.errors), 1)
+
+step_calls = []
+
+def execute(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+class SharedStepsTestCase(TestCase):
+    share_step_prefixes = True
+
+    feature = Feature.from_string(u"""
+Feature: Example
+    Scenario Outline: Rows
+        Given a shared step
+        And a row step
+        When I add row <n>
+        Then there are 2 rows
+
+        Examples:
+            | n |
+            | 1 |
+            | 2 |
+
+    Scenario: Plain
+        Given a shared step
+        Then there are 1 rows
+""")
+
+    @given(r'^a shared step$')
+    def given_shared_step(self, step):
+        step_calls.append('shared')
+        execute('INSERT INTO swanson_test_row (n) VALUES (0)')
+
+    @given(r'^a row step$')
+    def given_row_step(self, step):
+        step_calls.append('row')
+
+    @when(r'^I add row (\d+)$')
+    def when_add_row(self, step, n):
+        step_calls.append('add {}'.format(n))
+        execute('INSERT INTO swanson_test_row (n) VALUES (%s)', [int(n)])
+
+    @then(r'^there are (\d+) rows$')
+    def then_rows(self, step, count):
+        self.assertEqual(execute('SELECT COUNT(*) FROM swanson_test_row')[0][0], int(count))
+
+    def get_feature(self):
+        return self.feature
+
+    def run_rows(self):
+        self.run_scenario('Rows')
+
+    def run_plain(self):
+        self.run_scenario('Plain')
+
+class ClassSetupClientTestCase(TestCase):
+    run_background_once = True
+
+    feature = Feature.from_string(u"""
+Feature: Example
+    Background:
+        Given I have a cookie
+
+    Scenario: First
+        Then I have the cookie
+
+    Scenario: Second
+        Then I have the cookie
+""")
+
+    @given(r'^I have a cookie$')
+    def given_cookie(self, step):
+        self.client.cookies['token'] = 'background'
+
+    @then(r'^I have the cookie$')
+    def then_cookie(self, step):
+        self.assertEqual(self.client.cookies['token'].value, 'background')
+        self.assertNotIn('other', self.client.cookies)
+        # Not seen by the next test.
+        self.client.cookies['other'] = 'value'
+
+    def get_feature(self):
+        return self.feature
+
+    def run_first(self):
+        self.run_scenario('First')
+
+    def run_second(self):
+        self.run_scenario('Second')
+
+# Django < 1.8 has no setUpTestData.
+@unittest.skipUnless(hasattr(test.TestCase, 'setUpTestData'), 'Requires setUpTestData')
+class DjangoTestCaseTestCase(unittest.TestCase):
+    def setUp(self):
+        execute('CREATE TABLE IF NOT EXISTS swanson_test_row (n integer)')
+        del step_calls[:]
+
+    def run_tests(self, cls, method_names):
+        result = unittest.TestResult()
+        unittest.TestSuite([cls(method_name) for method_name in method_names]).run(result)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.failures, [])
+        self.assertEqual(result.testsRun, len(method_names))
+
+    def test_shared_step_prefixes(self):
+        # Each row runs from a savepoint, so doesn't see the rows before's
+        # writes, and shared steps only run once.
+        self.run_tests(SharedStepsTestCase, ['run_rows', 'run_plain'])
+        self.assertEqual(step_calls, ['shared', 'row', 'add 1', 'add 2'])
+        self.assertEqual(execute('SELECT COUNT(*) FROM swanson_test_row')[0][0], 0)
+
+    def test_class_setup_client_cookies(self):
+        self.run_tests(ClassSetupClientTestCase, ['run_first', 'run_second'])
@@ -31,6 +31,24 @@ class FunctionParamsTestCase(BaseTestCase):
         with self.assertRaises(CodeGen.InvalidParameters):
             CodeGen.generate_function_params(['a', 'a'])
 
+class RawStringTestCase(BaseTestCase):
+    def test_generate(self):
+        self.assertEqual(CodeGen.generate_raw_string(u'plain text'), "r'plain text'")
+
+    def test_quotes(self):
+        self.assertEqual(CodeGen.generate_raw_string(u'it\'s "quoted"'), 'r\'it\\\'s "quoted"\'')
+        self.assertEqual(CodeGen.generate_raw_string(u'it\'s "quoted"', '"'), 'r"it\'s \\"quoted\\""')
+
+    def test_backslashes(self):
+        self.assertEqual(CodeGen.generate_raw_string(u'a\\b'), "r'a\\b'")
+
+    def test_unprintable(self):
+        self.assertEqual(CodeGen.generate_raw_string(u'a\tb\x00'), "r'a\\tb\\x00'")
+
+    def test_native_string(self):
+        # Byte strings on Python 2.
+        self.assertEqual(CodeGen.generate_raw_string(str('it\'s')), "r'it\\'s'")
+
 class FunctionTestCase(BaseTestCase):
     def test_generate(self):
         self.assertGenerated(
@@ -314,3 +332,138 @@ class TestModuleTestCase(BaseTestCase):
                 'Scenario Outline title|u': repr(u'Scenario Outline title')
             })
         )
+
+class MergeTestModuleTestCase(BaseTestCase):
+    def setUp(self):
+        self.feature = Feature.from_string(u"""
+            Feature: Eating
+                Scenario: Eating apples
+                    Given I have 8 apples
+                    When I eat 2 apples
+                    Then I have 6 apples left
+
+                Scenario: Eating pears
+                    Given I have 8 pears
+                    When I eat 2 pears
+        """)
+
+    def test_merge(self):
+        source = textwrap.dedent('''
+            from swanson import TestCase, step, given, when, then
+
+            class BDDEatingTestCase(TestCase):
+                def test_eating_apples(self):
+                    self.run_scenario('Eating apples')
+
+                @given(r'(?i)^I have (\\d+) apples$')
+                def given_i_have_8_pears(self, step):
+                    pass
+
+                @step(r'(?i)^I eat 2 (apples|pears)$', clause='when')
+                def eat(self, step):
+                    pass
+
+            def helper():
+                pass
+        ''')
+
+        self.assertGenerated(
+            CodeGen.merge_test_module(self.feature, source).strip('\n'),
+            r'''
+            from swanson import TestCase, step, given, when, then
+
+            class BDDEatingTestCase(TestCase):
+                def test_eating_apples(self):
+                    self.run_scenario('Eating apples')
+
+                @given(r'(?i)^I have (\d+) apples$')
+                def given_i_have_8_pears(self, step):
+                    pass
+
+                @step(r'(?i)^I eat 2 (apples|pears)$', clause='when')
+                def eat(self, step):
+                    pass
+
+                def test_eating_pears(self):
+                    """
+                    Eating pears
+                    """
+
+                    self.run_scenario({Eating pears|u})
+
+                @given(r'(?i)^I have 8 pears$')
+                def given_i_have_8_pears_2(self, step):
+                    """
+                    Given I have 8 pears
+                    """
+
+                    assert False
+
+                @then(r'(?i)^I have 6 apples left$')
+                def then_i_have_6_apples_left(self, step):
+                    """
+                    Then I have 6 apples left
+                    """
+
+                    assert False
+
+            def helper():
+                pass
+            '''.format(**{
+                'Eating pears|u': repr(u'Eating pears')
+            })
+        )
+
+    def test_nothing_missing(self):
+        source = CodeGen.generate_test_module(self.feature)
+        self.assertIsNone(CodeGen.merge_test_module(self.feature, source))
+
+    def test_no_test_case(self):
+        self.assertIsNone(CodeGen.merge_test_module(self.feature, '# Nothing here\n'))
+
+    def test_base_class_handlers(self):
+        source = textwrap.dedent('''
+            class Steps(TestCase):
+                @given('I have 8 (apples|pears)')
+                @when('I eat 2 (apples|pears)')
+                def fruit(self, step):
+                    pass
+
+            class BDDEatingTestCase(Steps):
+                def test_eating_apples(self):
+                    self.run_scenario('Eating apples')
+
+                def test_eating_pears(self):
+                    self.run_scenario('Eating pears')
+        ''')
+
+        merged = CodeGen.merge_test_module(self.feature, source)
+        self.assertEqual(merged.count('@'), 3)
+        self.assertIn("@then(r'(?i)^I have 6 apples left$')", merged)
+
+    def test_unknown_base_class(self):
+        source = textwrap.dedent('''
+            from steps import FruitTestCase
+
+            class BDDEatingTestCase(FruitTestCase):
+                def test_eating_apples(self):
+                    self.run_scenario('Eating apples')
+        ''')
+
+        merged = CodeGen.merge_test_module(self.feature, source)
+        self.assertIn('def test_eating_pears(self):', merged)
+        self.assertNotIn('@', merged)
+
+    def test_dynamic_titles_and_patterns(self):
+        source = textwrap.dedent('''
+            class BDDEatingTestCase(TestCase):
+                def test_scenarios(self):
+                    for title in TITLES:
+                        self.run_scenario(title)
+
+                @given(PATTERN)
+                def given_fruit(self, step):
+                    pass
+        ''')
+
+        self.assertIsNone(CodeGen.merge_test_module(self.feature, source))
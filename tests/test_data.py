@@ -1,8 +1,14 @@
+import io
+import os
+import shutil
+import tempfile
 import unittest
 
+import gherkin_parser
 from gherkin_parser import parse_lines
 
-from swanson.data import Feature, Scenario, ScenarioOutline
+from swanson import data, parsing
+from swanson.data import Feature, Scenario, ScenarioOutline, Table
 
 class ModelTestCase(unittest.TestCase):
     def setUp(self):
@@ -139,6 +145,35 @@ class ModelTestCase(unittest.TestCase):
         self.assertEqual(expanded[1].steps[2].clause, 'then')
         self.assertEqual(expanded[1].steps[2].title, 'key2 is value2-then')
 
+    def test_scenario_outline_shares_structure(self):
+        scenario = self.feature.scenarios[1]
+
+        expanded = list(scenario.expand_examples())
+        self.assertEqual(len(expanded), 2)
+
+        self.assertIs(expanded[0].feature, self.feature)
+        self.assertIs(expanded[0].steps[0].scenario, expanded[0])
+        self.assertIs(expanded[0].steps[0].step, scenario.steps[0])
+        self.assertEqual(expanded[0].steps[0].index, scenario.steps[0].index)
+        self.assertEqual(str(expanded[1].steps[2]), 'Then key2 is value2-then')
+
+        # The outline itself is left untouched.
+        self.assertEqual(scenario.steps[0].title, '<key> is <value>-given')
+
+    def test_scenario_outline_for_example(self):
+        scenario = self.feature.scenarios[1]
+
+        expanded = scenario.for_example({'KEY': 'key3', 'value': None})
+        self.assertEqual(expanded.steps[0].title, 'key3 is -given')
+        self.assertEqual(expanded.steps[0].text, 'Text key3 is ')
+
+    def test_get_scenarios(self):
+        self.assertEqual(
+            self.feature.get_scenarios('Scenario outline title'),
+            [self.feature.scenarios[1]]
+        )
+        self.assertEqual(self.feature.get_scenarios('Missing title'), [])
+
     def test_table(self):
         table = self.feature.scenarios[0].steps[0].table
 
@@ -156,3 +191,191 @@ class ModelTestCase(unittest.TestCase):
             {'key': 'def', 'value': '456'},
             {'key': 'ghi', 'value': None}
         ])
+
+class ParsedCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        self.filename = os.path.join(self.directory, 'example.feature')
+        with open(self.filename, 'w') as fp:
+            fp.write(u"""
+                Feature: Feature title
+                    Scenario: Scenario title
+                        Given a step
+                            | key | value |
+            """)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_store_and_load(self):
+        feature = Feature.from_filename(self.filename, cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        original_parse_lines = gherkin_parser.parse_lines
+        gherkin_parser.parse_lines = None
+        try:
+            cached_feature = Feature.from_filename(self.filename, cache_dir=self.cache_dir)
+        finally:
+            gherkin_parser.parse_lines = original_parse_lines
+
+        self.assertEqual(cached_feature.filename, self.filename)
+        self.assertEqual(cached_feature.title, feature.title)
+        self.assertEqual(cached_feature.scenarios[0].steps[0].index, 3)
+        self.assertEqual(list(cached_feature.scenarios[0].steps[0].table), [['key', 'value']])
+
+    def test_matches_uncached_parse(self):
+        self.assertEqual(
+            data.load_parsed_from_filename(self.filename, self.cache_dir),
+            gherkin_parser.parse_from_filename(self.filename)
+        )
+
+    def test_line_separator_in_step(self):
+        with io.open(self.filename, 'w', encoding='utf8') as fp:
+            fp.write(u'Feature: Feature title\n    Scenario: Scenario title\n        Given a\u2028step\n')
+
+        self.assertEqual(
+            data.load_parsed_from_filename(self.filename, self.cache_dir),
+            parsing.parse_filename(self.filename)
+        )
+        feature = Feature.from_filename(self.filename, cache_dir=self.cache_dir)
+        self.assertEqual(feature.scenarios[0].steps[0].title, u'a\u2028step')
+
+    def test_ignores_unreadable_cache(self):
+        with open(self.filename, 'rb') as fp:
+            cache_filename = data.get_parsed_cache_filename(fp.read(), self.cache_dir)
+
+        os.makedirs(self.cache_dir)
+        with open(cache_filename, 'wb') as fp:
+            fp.write(b'not marshal data')
+
+        feature = Feature.from_filename(self.filename, cache_dir=self.cache_dir)
+        self.assertEqual(feature.title, 'Feature title')
+        self.assertIsNotNone(data.load_parsed(cache_filename))
+
+class TableTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = Feature.from_string(u"""
+            Feature: Feature title
+                Scenario: Scenario title
+                    Given a table
+                        | name  | colour |
+                        | apple | red    |
+                        | grape | red    |
+        """).scenarios[0].steps[0].table
+
+    def test_header(self):
+        self.assertEqual(self.table.header, ['name', 'colour'])
+
+    def test_dicts(self):
+        dicts = self.table.dicts
+
+        self.assertEqual(len(dicts), 2)
+        self.assertEqual(dicts[-1], {'name': 'grape', 'colour': 'red'})
+        self.assertEqual(dicts, [
+            {'name': 'apple', 'colour': 'red'},
+            {'name': 'grape', 'colour': 'red'}
+        ])
+
+    def test_column_values_interned(self):
+        rows = list(self.table)
+        self.assertIs(rows[1][1], rows[2][1])
+
+    def test_ragged_rows(self):
+        table = Table([
+            {'index': 0, 'columns': ['a', 'b']},
+            {'index': 1, 'columns': ['1']},
+            {'index': 2, 'columns': ['2', '3', '4']},
+            {'index': 3, 'columns': []},
+        ])
+
+        self.assertEqual(list(table), [['a', 'b'], ['1'], ['2', '3', '4'], []])
+        self.assertEqual(list(table.dicts), [
+            {'a': '1', 'b': None},
+            {'a': '2', 'b': '3'},
+            {'a': None, 'b': None}
+        ])
+
+    def test_many_distinct_values(self):
+        rows = [['value {}'.format(index)] for index in range(70000)]
+        table = Table([{'index': index, 'columns': row} for index, row in enumerate(rows)])
+
+        self.assertEqual(len(table), 70000)
+        self.assertEqual(list(table), rows)
+
+    def test_empty(self):
+        table = Table([])
+
+        self.assertEqual(len(table), 0)
+        self.assertEqual(list(table), [])
+        self.assertEqual(list(table.dicts), [])
+
+    def test_slots(self):
+        feature = Feature.from_string(u"""
+            Feature: Feature title
+                Scenario: Scenario title
+                    Given a step
+        """)
+
+        for obj in (feature, feature.scenarios[0], feature.scenarios[0].steps[0]):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+class CommonPrefixTestCase(unittest.TestCase):
+    feature = Feature.from_string(u"""
+Feature: Example
+    Scenario: First
+        Given a user
+        And an organisation
+            | name  |
+            | Acme  |
+        And a product
+        When I buy it
+
+    Scenario: Second
+        Given a user
+        And an organisation
+            | name  |
+            | Acme  |
+        And a basket
+        When I empty it
+
+    Scenario: Third
+        Given a user
+        And an organisation
+            | name  |
+            | Other |
+        When I leave
+
+    Scenario Outline: Fourth
+        Given a user
+        And an organisation named <name>
+        When I leave
+
+        Examples:
+            | name |
+            | Acme |
+            | Acme |
+""")
+
+    def get_steps(self, *titles):
+        return [
+            scenario.steps
+            for scenario in self.feature.scenarios
+            if scenario.title in titles
+        ]
+
+    def test_common_prefix(self):
+        self.assertEqual(data.get_common_prefix_length(self.get_steps('First', 'Second')), 2)
+
+    def test_different_tables(self):
+        self.assertEqual(data.get_common_prefix_length(self.get_steps('First', 'Second', 'Third')), 1)
+
+    def test_only_given_steps(self):
+        self.assertEqual(data.get_common_prefix_length(self.get_steps('Third', 'Third')), 2)
+
+    def test_examples(self):
+        outline = self.feature.scenarios[3]
+        self.assertEqual(data.get_common_prefix_length(scenario.steps for scenario in outline.expand_examples()), 2)
+
+    def test_empty(self):
+        self.assertEqual(data.get_common_prefix_length([]), 0)
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from swanson.decorators import given
+from swanson.files import get_file_key
+from swanson.test.dependencies import DependencyMap, get_scenario_dependencies
+
+@given('^a shared step$')
+def shared_step(self, step):
+    pass
+
+class DependencyMapTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        self.feature_filename = os.path.join(self.directory, 'example.feature')
+        self.write(self.feature_filename, 'Feature: Example')
+
+    def test_get_scenario_dependencies(self):
+        self.assertEqual(
+            get_scenario_dependencies(self, self.feature_filename, [shared_step]),
+            sorted([get_file_key(self.feature_filename), get_file_key(__file__)])
+        )
+
+    def test_is_changed(self):
+        dependency_map = self.create_dependency_map()
+        self.assertFalse(DependencyMap.load(self.map_filename).is_changed('tests.Example.test_scenario'))
+        self.assertTrue(dependency_map.is_changed('tests.Example.test_other'))
+
+        self.write(self.feature_filename, 'Feature: Changed')
+        self.assertTrue(DependencyMap.load(self.map_filename).is_changed('tests.Example.test_scenario'))
+
+    def test_deleted_file(self):
+        self.create_dependency_map()
+        os.remove(self.feature_filename)
+        self.assertTrue(DependencyMap.load(self.map_filename).is_changed('tests.Example.test_scenario'))
+
+    def test_discard(self):
+        dependency_map = self.create_dependency_map()
+        dependency_map.discard('tests.Example.test_scenario')
+        self.assertTrue(dependency_map.is_changed('tests.Example.test_scenario'))
+
+    def test_missing_file(self):
+        dependency_map = DependencyMap.load(os.path.join(self.directory, 'missing.json'))
+        self.assertTrue(dependency_map.is_changed('tests.Example.test_scenario'))
+
+    def create_dependency_map(self):
+        self.map_filename = os.path.join(self.directory, 'dependencies.json')
+
+        dependency_map = DependencyMap()
+        dependency_map.record(
+            'tests.Example.test_scenario',
+            'example.feature',
+            'Scenario title',
+            [get_file_key(self.feature_filename)]
+        )
+        dependency_map.save(self.map_filename)
+        return dependency_map
+
+    def write(self, filename, content):
+        with open(filename, 'w') as fp:
+            fp.write(content)
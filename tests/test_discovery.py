@@ -0,0 +1,68 @@
+import os
+import unittest
+
+from swanson import discovery
+from swanson.cache import FeatureCache
+
+from tests.helpers import FeatureDirectoryMixin
+
+class DiscoveryTestCase(FeatureDirectoryMixin, unittest.TestCase):
+    def setUp(self):
+        super(DiscoveryTestCase, self).setUp()
+
+        self.create_feature('app/tests/a.feature')
+        self.create_feature('app/tests/b.feature')
+        self.create_feature('app/tests/readme.txt')
+        self.create_feature('node_modules/package/c.feature')
+        self.create_feature('app.egg-info/d.feature')
+        self.create_feature('virtualenv/lib/e.feature')
+        self.create_feature('virtualenv/pyvenv.cfg')
+
+    def test_iter_feature_filenames(self):
+        self.assertEqual(self.iter_feature_filenames(), [
+            'app/tests/a.feature',
+            'app/tests/b.feature'
+        ])
+
+    def test_custom_exclude(self):
+        self.assertEqual(self.iter_feature_filenames(exclude=('app/tests',)), [
+            'app.egg-info/d.feature',
+            'node_modules/package/c.feature'
+        ])
+
+    def test_feature_filename_root(self):
+        filename = os.path.join(self.directory, 'app', 'tests', 'a.feature')
+        self.assertEqual(list(discovery.iter_feature_filenames([filename])), [filename])
+
+    def test_feature_index(self):
+        index = discovery.FeatureIndex([self.directory], feature_cache=FeatureCache())
+
+        self.assertEqual(
+            [feature.title for feature in index.get_features()],
+            ['app/tests/a.feature', 'app/tests/b.feature']
+        )
+        self.assertEqual(index.feature_cache.info().misses, 2)
+
+        index.get_features()
+        self.assertEqual(index.feature_cache.info().hits, 2)
+
+    def test_feature_index_parallel_parse(self):
+        for index in range(discovery.MIN_PARALLEL_PARSE_COUNT + 1):
+            self.create_feature('many/{:02}.feature'.format(index))
+
+        index = discovery.FeatureIndex(
+            [os.path.join(self.directory, 'many')],
+            feature_cache=FeatureCache(),
+            processes=2
+        )
+
+        self.assertEqual(
+            [feature.title for feature in index.get_features()],
+            ['many/{:02}.feature'.format(index) for index in range(discovery.MIN_PARALLEL_PARSE_COUNT + 1)]
+        )
+
+    def iter_feature_filenames(self, exclude=discovery.DEFAULT_EXCLUDE):
+        return [
+            os.path.relpath(filename, self.directory).replace(os.sep, '/')
+            for filename in discovery.iter_feature_filenames([self.directory], exclude)
+        ]
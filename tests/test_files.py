@@ -0,0 +1,67 @@
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from swanson import files
+
+class FileKeyTestCase(unittest.TestCase):
+    def test_file_key(self):
+        self.assertEqual(
+            files.get_file_key(os.path.abspath(os.path.join('app', 'example.feature'))),
+            'app/example.feature'
+        )
+
+class JSONTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.filename = os.path.join(self.directory, 'data.json')
+
+    def test_save_and_load(self):
+        files.save_json(self.filename, {'a': 1})
+        files.save_json(self.filename, {'b': 2})
+        self.assertEqual(files.load_json(self.filename), {'b': 2})
+        self.assertEqual(os.listdir(self.directory), ['data.json'])
+
+    def test_load_missing(self):
+        self.assertIsNone(files.load_json(self.filename))
+
+class RenameOverTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.source = self.create_file('source', 'new')
+        self.destination = self.create_file('destination', 'old')
+
+        # Rename as on Windows, which won't rename over an existing file.
+        original_rename = os.rename
+        def rename(source, destination):
+            if os.path.exists(destination):
+                raise OSError('File exists')
+            original_rename(source, destination)
+        os.rename = rename
+        self.addCleanup(setattr, os, 'rename', original_rename)
+
+    def create_file(self, name, content):
+        filename = os.path.join(self.directory, name)
+        with open(filename, 'w') as fp:
+            fp.write(content)
+        return filename
+
+    def read_file(self, filename):
+        with open(filename) as fp:
+            return fp.read()
+
+    def test_rename_over(self):
+        files.rename_over(self.source, self.destination)
+        self.assertEqual(self.read_file(self.destination), 'new')
+        self.assertEqual(os.listdir(self.directory), ['destination'])
+
+    def test_failed_rename_keeps_destination(self):
+        os.remove(self.source)
+        with self.assertRaises(OSError):
+            files.rename_over(self.source, self.destination)
+        self.assertEqual(self.read_file(self.destination), 'old')
+        self.assertEqual(os.listdir(self.directory), ['destination'])
@@ -0,0 +1,111 @@
+import os
+import unittest
+
+from swanson import generation
+from swanson.codegen import CodeGen
+from swanson.data import Feature
+
+from tests.helpers import FeatureDirectoryMixin, write_feature
+
+CODE_GENERATOR = 'swanson.codegen.CodeGen'
+
+class TestModuleGeneratorTestCase(FeatureDirectoryMixin, unittest.TestCase):
+    def setUp(self):
+        super(TestModuleGeneratorTestCase, self).setUp()
+
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, cwd)
+
+        self.feature_filenames = [self.create_feature('a'), self.create_feature('b')]
+
+    def create_feature(self, name):
+        # Relative to the temporary directory, the working directory.
+        return write_feature('{}.feature'.format(name), 'Feature {}'.format(name))
+
+    def get_generator(self, **kwargs):
+        return generation.TestModuleGenerator(self.feature_filenames, CODE_GENERATOR, **kwargs)
+
+    def test_test_filename(self):
+        self.assertEqual(generation.get_test_filename('app/tests/a.feature'), 'app/tests/test_a.py')
+
+    def test_generates_missing_modules(self):
+        with open('test_b.py', 'w') as fp:
+            fp.write('# Implemented')
+
+        self.assertEqual(self.get_generator().run(), ['test_a.py'])
+
+        with open('test_a.py') as fp:
+            self.assertEqual(fp.read(), CodeGen.generate_test_module(Feature.from_filename('a.feature')))
+        with open('test_b.py') as fp:
+            self.assertEqual(fp.read(), '# Implemented')
+
+    def test_merges_existing_modules(self):
+        self.get_generator().run()
+        with open('a.feature', 'a') as fp:
+            fp.write(u'    Scenario: Another scenario\n        Given another step\n')
+
+        self.assertEqual(self.get_generator().run(), ['test_a.py'])
+
+        with open('test_a.py') as fp:
+            source = fp.read()
+        self.assertIn('self.run_scenario({!r})'.format(u'Another scenario'), source)
+        self.assertIn("@given(r'(?i)^another step$')", source)
+        self.assertEqual(self.get_generator().run(), [])
+
+    def test_skips_unparseable_modules(self):
+        manifest = generation.GenerationManifest()
+        with open('test_b.py', 'w') as fp:
+            fp.write('class Broken(\n')
+
+        generator = self.get_generator(manifest=manifest)
+        self.assertEqual(generator.run(), ['test_a.py'])
+        self.assertEqual([filename for filename, _ in generator.skipped], ['test_b.py'])
+        self.assertIn('SyntaxError', generator.skipped[0][1])
+
+        with open('test_b.py') as fp:
+            self.assertEqual(fp.read(), 'class Broken(\n')
+        pending = self.get_generator(manifest=manifest).get_pending()
+        self.assertEqual([test_filename for _, test_filename, _ in pending], ['test_b.py'])
+
+    def test_check_writes_nothing(self):
+        self.assertEqual(self.get_generator().run(write=False), ['test_a.py', 'test_b.py'])
+        self.assertFalse(os.path.exists('test_a.py'))
+
+    def test_manifest(self):
+        manifest = generation.GenerationManifest()
+        self.get_generator(manifest=manifest).run()
+        self.assertEqual(self.get_generator(manifest=manifest).get_pending(), [])
+
+        with open('b.feature', 'a') as fp:
+            fp.write(u'    Scenario: Another scenario\n')
+        os.remove('test_a.py')
+
+        pending = self.get_generator(manifest=manifest).get_pending()
+        self.assertEqual([test_filename for _, test_filename, _ in pending], ['test_a.py', 'test_b.py'])
+
+    def test_manifest_save_and_load(self):
+        manifest = generation.GenerationManifest()
+        self.get_generator(manifest=manifest).run()
+        manifest.save('manifest.json')
+
+        loaded = generation.GenerationManifest.load('manifest.json')
+        self.assertEqual(self.get_generator(manifest=loaded).get_pending(), [])
+
+        missing = generation.GenerationManifest.load('missing.json')
+        self.assertEqual(len(self.get_generator(manifest=missing).get_pending()), 2)
+
+    def test_worker_processes(self):
+        self.feature_filenames = [
+            self.create_feature('feature_{}'.format(index))
+            for index in range(generation.MIN_PARALLEL_GENERATE_COUNT + 1)
+        ]
+
+        serial = self.get_generator(processes=1).run(write=False)
+        parallel = self.get_generator(processes=2).run(write=False)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(len(parallel), len(self.feature_filenames))
+
+    def test_code_generator_imported_once(self):
+        self.assertIs(generation.get_code_generator(CODE_GENERATOR), CodeGen)
+        self.assertIs(generation._code_generators[CODE_GENERATOR], CodeGen)
@@ -1,3 +1,4 @@
+import re
 import unittest
 
 import six
@@ -5,7 +6,7 @@ import six
 from swanson.data import Step
 from swanson.decorators import step, given, when, then
 from swanson.exceptions import MultipleStepHandlers, NoStepHandlers
-from swanson.handlers import StepHandlers
+from swanson.handlers import StepHandlers, get_literal_prefix
 
 class StepHandlersTestCase(unittest.TestCase):
     def test_handler_match_without_clause(self):
@@ -68,6 +69,72 @@ class StepHandlersTestCase(unittest.TestCase):
         match = step_handlers.get_handler_match_for_step(self.create_step('given', 'I have 10 bananas'))
         self.assertEqual(match.match.groups(), ('10',))
 
+    def test_multiple_handler_matches_listed_in_order(self):
+        @step(r'^I have (\d+) apples$')
+        def my_handler1():
+            pass
+
+        @given(r'apples$')
+        def my_handler2():
+            pass
+
+        @given(r'(?i)^i HAVE')
+        def my_handler3():
+            pass
+
+        step_handlers = StepHandlers([
+            my_handler1,
+            my_handler2,
+            my_handler3
+        ])
+
+        with self.assertRaises(MultipleStepHandlers) as cm:
+            step_handlers.get_handler_match_for_step(self.create_step('given', 'I have 10 apples'))
+
+        self.assertEqual(str(cm.exception).split('\n')[1:], [
+            " * step('^I have (\\\\d+) apples$')",
+            " * given('apples$')",
+            " * given('(?i)^i HAVE')"
+        ])
+
+    def test_case_insensitive_prefix(self):
+        @given(r'(?i)^I have (\d+) apples$')
+        def my_handler():
+            pass
+
+        step_handlers = StepHandlers([
+            my_handler
+        ])
+
+        match = step_handlers.get_handler_match_for_step(self.create_step('given', 'i HAVE 10 apples'))
+        self.assertEqual(match.match.groups(), ('10',))
+
+    def test_cached_match(self):
+        @given(r'^I have (\d+) apples$')
+        def my_handler():
+            pass
+
+        step_handlers = StepHandlers([
+            my_handler
+        ])
+
+        match1 = step_handlers.get_handler_match_for_step(self.create_step('given', 'I have 10 apples'))
+        match2 = step_handlers.get_handler_match_for_step(self.create_step('given', 'I have 10 apples'))
+        self.assertIs(match1, match2)
+
+        step_handlers.get_handler_match_for_step(self.create_step('given', 'I have 20 apples'))
+
+        self.assertEqual(step_handlers.cache_info(), (1, 2, None, 2))
+
+    def test_cached_failure(self):
+        step_handlers = StepHandlers([])
+
+        for _ in range(2):
+            with six.assertRaisesRegex(self, NoStepHandlers, r"^No step handlers found for 'Given I have 10 apples'$"):
+                step_handlers.get_handler_match_for_step(self.create_step('given', 'I have 10 apples'))
+
+        self.assertEqual(step_handlers.cache_info(), (1, 1, None, 1))
+
     def create_step(self, clause, title):
         return Step(None, {
             'title': {
@@ -78,3 +145,30 @@ class StepHandlersTestCase(unittest.TestCase):
             'text': {'content': None},
             'table': None
         })
+
+class LiteralPrefixTestCase(unittest.TestCase):
+    def test_prefix(self):
+        self.assertEqual(self.get_prefix(r'^I have (\d+) apples$'), 'i have ')
+        self.assertEqual(self.get_prefix(r'(?i)^I have'), 'i have')
+        self.assertEqual(self.get_prefix(r'\AI have'), 'i have')
+        self.assertEqual(self.get_prefix(r'^I\.e\. (.*)'), 'i.e. ')
+
+    def test_optional_characters(self):
+        self.assertEqual(self.get_prefix(r'^apples?'), 'apple')
+        self.assertEqual(self.get_prefix(r'^apples*'), 'apple')
+        self.assertEqual(self.get_prefix(r'^apples{2}'), 'apple')
+        self.assertEqual(self.get_prefix(r'^apples+'), 'apples')
+
+    def test_no_prefix(self):
+        self.assertEqual(self.get_prefix(r'I have'), '')
+        self.assertEqual(self.get_prefix(r'^\d+ apples'), '')
+        self.assertEqual(self.get_prefix(r'^apples|pears'), '')
+        self.assertEqual(self.get_prefix(r'(?m)^apples'), '')
+        self.assertEqual(self.get_prefix(r'(?x)^apples'), '')
+
+    def test_alternation_in_group(self):
+        self.assertEqual(self.get_prefix(r'^I have (apples|pears)'), 'i have ')
+        self.assertEqual(self.get_prefix(r'^I have [|(]'), 'i have ')
+
+    def get_prefix(self, pattern):
+        return get_literal_prefix(re.compile(pattern))
@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import unittest
+
+from swanson.test import journal
+from swanson.test.journal import Journal, MemoryJournal
+
+def write_from_worker(index):
+    journal.get_journal().write('worker', index=index)
+
+def is_recording_steps_in_worker(index):
+    return journal.is_recording(journal.STEP_RECORDS)
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.journal = Journal.create()
+        self.addCleanup(self.journal.delete)
+
+    def test_read(self):
+        self.journal.write('scenario', title='First')
+        self.journal.write('other', title='Second')
+        self.journal.write('scenario', title='Third')
+
+        self.assertEqual(
+            [record['title'] for record in self.journal.read('scenario')],
+            ['First', 'Third']
+        )
+
+    def test_activate(self):
+        self.assertIsNone(journal.get_journal())
+
+        journal.activate(self.journal)
+        try:
+            self.assertIs(journal.get_journal(), self.journal)
+        finally:
+            journal.deactivate(self.journal)
+
+        self.assertIsNone(journal.get_journal())
+        self.assertNotIn(journal.ENVIRON_KEY, os.environ)
+
+    def test_worker_processes(self):
+        journal.activate(self.journal)
+        try:
+            self.journal.write('worker', index=-1)
+
+            pool = multiprocessing.Pool(processes=2)
+            try:
+                pool.map(write_from_worker, range(4))
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            journal.deactivate(self.journal)
+
+        self.assertEqual(
+            sorted(record['index'] for record in self.journal.read('worker')),
+            [-1, 0, 1, 2, 3]
+        )
+
+    def test_step_records_in_worker_processes(self):
+        journal.activate(self.journal, [journal.STEP_RECORDS])
+        try:
+            pool = multiprocessing.Pool(processes=2)
+            try:
+                self.assertEqual(pool.map(is_recording_steps_in_worker, range(2)), [True, True])
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            journal.deactivate(self.journal)
+
+        self.assertNotIn(journal.ENVIRON_RECORDS_KEY, os.environ)
+
+class OptionalRecordsTestCase(unittest.TestCase):
+    def id(self):
+        return 'example'
+
+    def record_scenario_result(self, records):
+        memory_journal = MemoryJournal()
+        journal.activate(memory_journal, records)
+        try:
+            journal.record_post_scenario_test(
+                self,
+                feature_filename='example.feature',
+                scenario_title='Example',
+                duration=0.5,
+                success=True
+            )
+        finally:
+            journal.deactivate(memory_journal)
+        return next(memory_journal.read('scenario_result'))
+
+    def test_dependencies_not_recorded_by_default(self):
+        self.assertIsNone(self.record_scenario_result(())['dependencies'])
+
+    def test_dependencies_recorded_when_asked(self):
+        self.assertIn(
+            'example.feature',
+            self.record_scenario_result([journal.DEPENDENCY_RECORDS])['dependencies']
+        )
+
+    def record_feature_parse(self, records):
+        memory_journal = MemoryJournal()
+        journal.activate(memory_journal, records)
+        try:
+            journal.record_post_feature_parse(None, filename='example.feature', duration=0.5)
+        finally:
+            journal.deactivate(memory_journal)
+        return list(memory_journal.read('feature_parse'))
+
+    def test_steps_not_recorded_by_default(self):
+        self.assertEqual(self.record_feature_parse(()), [])
+
+    def test_steps_recorded_when_asked(self):
+        self.assertEqual(
+            [record['filename'] for record in self.record_feature_parse([journal.STEP_RECORDS])],
+            ['example.feature']
+        )
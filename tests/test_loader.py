@@ -0,0 +1,97 @@
+import types
+import unittest
+
+from swanson.codegen import DuplicateScenarioTitles
+from swanson.data import Feature
+from swanson.decorators import given, then
+from swanson.parsing import parse_lines
+from swanson.test.case import TestCaseMixin
+from swanson.test.loader import create_test_case, create_test_cases, get_module_step_handlers
+
+def create_feature(source, filename):
+    return Feature(parse_lines(source.split('\n')), filename)
+
+FEATURES = [
+    create_feature(u"""
+Feature: Apples
+    Scenario: Eat an apple
+        Given I have 2 apples
+        Then I have 2 apples
+
+    Scenario Outline: Count apples
+        Given I have <count> apples
+        Then I have <count> apples
+
+        Examples:
+            | count |
+            | 1     |
+            | 3     |
+""", 'apples.feature'),
+    create_feature(u"""
+Feature: Apples
+    Scenario: Have no apples
+        Given I have 0 apples
+""", 'more_apples.feature')
+]
+
+steps = types.ModuleType('steps')
+
+@given(r'^I have (\d+) apples$')
+def given_apples(self, step, count):
+    self.apples = int(count)
+
+@then(r'^I have (\d+) apples$')
+def then_apples(self, step, count):
+    self.assertEqual(self.apples, int(count))
+
+steps.given_apples = given_apples
+steps.then_apples = then_apples
+steps.unrelated = 123
+
+class BaseTestCase(TestCaseMixin, unittest.TestCase):
+    def get_feature(self):
+        return dict((feature.filename, feature) for feature in FEATURES)[self.get_feature_filename()]
+
+class LoaderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_cases = create_test_cases(__name__, FEATURES, [steps], BaseTestCase)
+
+    def test_module_step_handlers(self):
+        self.assertEqual(list(get_module_step_handlers(steps)), ['given_apples', 'then_apples'])
+
+    def test_test_cases(self):
+        self.assertEqual(list(self.test_cases), ['BDDApplesTestCase', 'BDDApplesTestCase_2'])
+
+        test_case = self.test_cases['BDDApplesTestCase']
+        self.assertEqual(test_case.__module__, __name__)
+        self.assertEqual(test_case.__doc__, 'Apples')
+        self.assertEqual(test_case.feature_filename, 'apples.feature')
+        self.assertEqual(test_case.test_eat_an_apple.__doc__, 'Eat an apple')
+        self.assertTrue(hasattr(test_case, 'test_count_apples'))
+
+    def test_shared_step_handlers(self):
+        first, second = self.test_cases.values()
+        self.assertIs(first.get_class_step_handlers(), second.get_class_step_handlers())
+        self.assertEqual(len(first.get_class_step_handlers()), 2)
+
+    def test_run(self):
+        suite = unittest.defaultTestLoader.loadTestsFromTestCase(self.test_cases['BDDApplesTestCase'])
+        result = unittest.TestResult()
+        suite.run(result)
+
+        self.assertEqual(result.testsRun, 2)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.failures, [])
+
+    def test_duplicate_scenario_titles(self):
+        feature = create_feature(u"""
+Feature: Duplicates
+    Scenario: Same
+        Given I have 1 apples
+
+    Scenario: Same
+        Given I have 2 apples
+""", 'duplicates.feature')
+
+        with self.assertRaises(DuplicateScenarioTitles):
+            create_test_case(__name__, feature, base=BaseTestCase)
@@ -0,0 +1,155 @@
+import unittest
+
+import gherkin_parser
+from gherkin_parser.exceptions import ParseError
+
+from swanson import parsing
+
+class ParseLinesTestCase(unittest.TestCase):
+    def assertParsesLikeGherkinParser(self, string):
+        lines = string.split('\n')
+        self.assertEqual(parsing.parse_lines(iter(lines)), gherkin_parser.parse_lines(lines))
+
+    def test_step_tables(self):
+        self.assertParsesLikeGherkinParser(u"""
+            Feature: Feature title
+                Background:
+                    Given a table
+                        | a | b |
+                        | 1 | 2 |
+
+                Scenario: Scenario title
+                    Given a table
+                        | a | b |
+                        |  1|2  |
+                        | 3 |   |
+                    When another table
+                        | c |
+                        | 4 |
+                    Then no table
+        """)
+
+    def test_examples_tables(self):
+        self.assertParsesLikeGherkinParser(u"""
+            Feature: Feature title
+                Scenario Outline: Outline title
+                    Given <a> and <b>
+
+                    Examples:
+                        | a | b |
+                        | 1 | 2 |
+                        | 3 | 4 |
+        """)
+
+    def test_blank_and_comment_lines_between_rows(self):
+        self.assertParsesLikeGherkinParser(u"""
+            Feature: Feature title
+                Scenario: Scenario title
+                    Given a table
+                        | a | b |
+
+                        # A comment
+                        | 1 | 2 |
+                        # Another comment
+                        | 3 | 4 |
+        """)
+
+    def test_escaped_cells(self):
+        self.assertParsesLikeGherkinParser(u"""
+            Feature: Feature title
+                Scenario: Scenario title
+                    Given a table
+                        | a   | b    |
+                        | \\| | 2\\\\ |
+        """)
+
+    def test_empty_rows(self):
+        self.assertParsesLikeGherkinParser(u"""
+            Feature: Feature title
+                Scenario: Scenario title
+                    Given a table
+                        | a |
+                        |
+                        ||
+        """)
+
+    def test_rows_in_descriptions(self):
+        self.assertParsesLikeGherkinParser(u"""
+            Feature: Feature title
+                | not | a table |
+                | still | not |
+
+                Scenario: Scenario title
+                    | nor | this |
+                    | or | this |
+                    Given a step
+        """)
+
+    def test_text_blocks(self):
+        self.assertParsesLikeGherkinParser(u'''
+            Feature: Feature title
+                Scenario: Scenario title
+                    Given a text block
+                        """
+                        | not | a table |
+                        | still | not |
+                        """
+                        | a | b |
+                        | 1 | 2 |
+        ''')
+
+    def test_backslashes(self):
+        self.assertParsesLikeGherkinParser(u"""
+            Feature: Feature title
+                Scenario: Scenario title
+                    Given a table
+                        | a  | b  | c |
+                        | \\ | \\x | a\\ |
+        """)
+
+    def test_parse_error_after_table(self):
+        lines = [
+            u'Feature: Feature title',
+            u'    Scenario: Scenario title',
+            u'        Given a table',
+            u'            | a |',
+            u'            | 1 |',
+            u'        Examples:',
+        ]
+
+        with self.assertRaises(ParseError) as context:
+            gherkin_parser.parse_lines(lines)
+        expected = context.exception
+
+        with self.assertRaises(ParseError) as context:
+            parsing.parse_lines(iter(lines))
+        self.assertEqual(str(context.exception), str(expected))
+        self.assertEqual(context.exception.line_index, expected.line_index)
+
+class ParseBytesTestCase(unittest.TestCase):
+    def test_universal_newlines(self):
+        content = u'Feature: Feature title\r\n    Scenario: Scenario\u2028title\r    Given a step\n'
+        self.assertEqual(
+            parsing.parse_bytes(content.encode('utf8')),
+            gherkin_parser.parse_lines([
+                u'Feature: Feature title\n',
+                u'    Scenario: Scenario\u2028title\n',
+                u'    Given a step\n'
+            ])
+        )
+
+class SplitTablesTestCase(unittest.TestCase):
+    def test_keeps_line_numbers(self):
+        strings = [
+            u'Feature: Feature title',
+            u'    Scenario: Scenario title',
+            u'        Given a table',
+            u'            | a |',
+            u'            | 1 |',
+            u'            | 2 |',
+            u'        Then a step',
+        ]
+
+        lines, tables = parsing.split_tables(strings)
+        self.assertEqual(lines, strings[:4] + [u'', u''] + strings[6:])
+        self.assertEqual(tables, {3: [(4, strings[4]), (5, strings[5])]})
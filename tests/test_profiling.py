@@ -0,0 +1,134 @@
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from swanson.data import Feature
+from swanson.decorators import given
+from swanson.test import profiling
+from swanson.test.case import TestCaseMixin
+from swanson.test.profiling import StepTimings
+
+def step_record(step, handler, match_duration, run_duration):
+    return {
+        'feature_filename': 'example.feature',
+        'scenario_title': 'Scenario title',
+        'step': step,
+        'line': 3,
+        'handler': handler,
+        'pattern': '^{}$'.format(step) if handler else None,
+        'match_duration': match_duration,
+        'run_duration': run_duration,
+        'success': True
+    }
+
+class StepTimingsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.step_timings = StepTimings(
+            [
+                step_record('Given a fast step', 'steps.fast', 0.5, 1.0),
+                step_record('Given a slow step', 'steps.slow', 0.5, 3.0),
+                step_record('Given a fast step', 'steps.fast', 0.5, 2.0),
+                step_record('Given a missing step', None, 0.25, 0.0)
+            ],
+            [
+                {'filename': 'example.feature', 'duration': 0.5}
+            ]
+        )
+
+    def test_totals(self):
+        self.assertEqual(self.step_timings.match_duration, 1.75)
+        self.assertEqual(self.step_timings.run_duration, 6.0)
+        self.assertEqual(self.step_timings.parse_count, 1)
+        self.assertEqual(self.step_timings.parse_duration, 0.5)
+
+    def test_slowest_handlers(self):
+        self.assertEqual(
+            [
+                (handler_timings.handler, handler_timings.count, handler_timings.duration, handler_timings.max_run_duration)
+                for handler_timings in self.step_timings.get_slowest_handlers(2)
+            ],
+            [
+                ('steps.fast', 2, 4.0, 2.0),
+                ('steps.slow', 1, 3.5, 3.0)
+            ]
+        )
+
+    def test_slowest_steps(self):
+        self.assertEqual(
+            [record['run_duration'] for record in self.step_timings.get_slowest_steps(3)],
+            [3.0, 2.0, 1.0]
+        )
+
+    def test_format_report(self):
+        report = self.step_timings.format_report(5)
+        self.assertIn("steps.fast ('^Given a fast step$')", report)
+        self.assertIn('<no handler>', report)
+
+class ProfiledTestCase(TestCaseMixin, unittest.TestCase):
+    feature = Feature.from_string(u"""
+@feature-tag
+Feature: Example
+    Scenario: First
+        Given a step
+
+    @slow
+    Scenario: Second
+        Given a step
+""")
+
+    profile_scenarios = ['^Fir']
+
+    @given(r'^a step$')
+    def given_step(self, step):
+        pass
+
+    def get_feature(self):
+        return self.feature
+
+    def run_first(self):
+        self.run_scenario('First')
+
+    def run_second(self):
+        self.run_scenario('Second')
+
+class ProfilingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        profiling.connect()
+        profiling.activate([], self.directory)
+        self.addCleanup(profiling.deactivate)
+
+    def test_matches_patterns(self):
+        first, second = ProfiledTestCase.feature.scenarios
+        self.assertTrue(profiling.matches_patterns(second, ['@slow']))
+        self.assertFalse(profiling.matches_patterns(first, ['@slow']))
+        self.assertTrue(profiling.matches_patterns(first, ['@feature-tag']))
+        self.assertTrue(profiling.matches_patterns(first, ['irs']))
+        self.assertFalse(profiling.matches_patterns(first, ['^irs', '@other']))
+
+    def test_profile_scenarios_attribute(self):
+        ProfiledTestCase('run_first').run_first()
+        ProfiledTestCase('run_second').run_second()
+        self.assertEqual(os.listdir(self.directory), ['{}.prof'.format(ProfiledTestCase('run_first').id())])
+
+    def test_activated_patterns(self):
+        profiling.activate(['@slow'], self.directory)
+        ProfiledTestCase('run_second').run_second()
+        self.assertEqual(os.listdir(self.directory), ['{}.prof'.format(ProfiledTestCase('run_second').id())])
+
+    def test_save_slowest_profiles(self):
+        profiling.activate(['@slow'], self.directory)
+        ProfiledTestCase('run_first').run_first()
+        ProfiledTestCase('run_second').run_second()
+
+        records = [
+            {'filename': os.path.join(self.directory, '{}.prof'.format(ProfiledTestCase(method_name).id())), 'duration': duration}
+            for method_name, duration in [('run_first', 1.0), ('run_second', 2.0)]
+        ]
+        filename = os.path.join(self.directory, 'slowest.prof')
+        self.assertEqual(profiling.save_slowest_profiles(records, 1, filename), 1)
+        self.assertTrue(pstats.Stats(filename).total_calls)
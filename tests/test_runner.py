@@ -0,0 +1,241 @@
+import os
+import unittest
+
+from swanson import discovery
+from swanson.cache import FeatureCache
+from swanson.exceptions import UnimplementedScenariosError
+from swanson.files import get_file_key
+from swanson.test import dependencies, journal, runner, scheduling
+from swanson.test.case import TestCaseMixin
+
+from tests.helpers import FeatureDirectoryMixin
+
+class ExampleTestCase(unittest.TestCase):
+    def test_a(self):
+        pass
+
+class SuiteRunner(object):
+    """
+    Stands in for Django's runner, building `suite` rather than discovering
+    the project's tests.
+    """
+
+    test_suite = unittest.TestSuite
+
+    def __init__(self, suite):
+        self.suite = suite
+
+    def build_suite(self, test_labels=None, extra_tests=None, **kwargs):
+        return self.suite
+
+class ExampleRunner(runner.TestRunnerMixin, SuiteRunner):
+    pass
+
+def create_test_case(feature_filename, scenario_count=1):
+    attrs = {'feature_filename': feature_filename}
+    for index in range(scenario_count):
+        attrs['test_scenario_{}'.format(index)] = lambda self: None
+    name = 'BDD{}TestCase'.format(scheduling.get_shard_index(feature_filename, 10 ** 8))
+    return type(name, (TestCaseMixin, unittest.TestCase), attrs)
+
+def get_test_ids(suite, predicate=lambda key: True):
+    return sorted(
+        test.id()
+        for test in scheduling.iter_tests(suite)
+        if not isinstance(test, runner.UnimplementedBDDTestCase)
+        and predicate(scheduling.get_test_key(test))
+    )
+
+class RunnerTestCase(FeatureDirectoryMixin, unittest.TestCase):
+    def setUp(self):
+        super(RunnerTestCase, self).setUp()
+
+        self.feature_filenames = [
+            self.create_feature('feature_{}.feature'.format(index))
+            for index in range(8)
+        ]
+        self.test_cases = [
+            create_test_case(feature_filename, scenario_count=index % 3 + 1)
+            for index, feature_filename in enumerate(self.feature_filenames)
+        ]
+
+    def get_suite(self):
+        loader = unittest.TestLoader()
+        return unittest.TestSuite(
+            [loader.loadTestsFromTestCase(test_case) for test_case in self.test_cases] +
+            [ExampleTestCase('test_a')]
+        )
+
+class ShardTestCase(RunnerTestCase):
+    def test_rejects_partial_or_out_of_range_shard(self):
+        with self.assertRaises(ValueError):
+            runner.DiscoverRunner(shard_index=0)
+        with self.assertRaises(ValueError):
+            runner.DiscoverRunner(shard_count=2)
+        with self.assertRaises(ValueError):
+            runner.DiscoverRunner(shard_index=2, shard_count=2)
+        with self.assertRaises(ValueError):
+            runner.DiscoverRunner(shard_index=-1, shard_count=2)
+
+    def test_suite_split_between_shards(self):
+        test_ids = []
+        for shard_index in range(3):
+            test_runner = ExampleRunner(self.get_suite(), shard_index=shard_index, shard_count=3)
+            shard_test_ids = get_test_ids(test_runner.build_suite())
+
+            self.assertEqual(shard_test_ids, get_test_ids(
+                self.get_suite(),
+                lambda key: scheduling.get_shard_index(key, 3) == shard_index
+            ))
+            test_ids.extend(shard_test_ids)
+
+        self.assertEqual(sorted(test_ids), get_test_ids(self.get_suite()))
+
+    def test_shards_packed_from_timings(self):
+        timings = scheduling.Timings(dict(
+            (get_file_key(feature_filename), {'Scenario title': float(index + 1)})
+            for index, feature_filename in enumerate(self.feature_filenames)
+        ))
+
+        test_ids = []
+        for shard_index in range(2):
+            test_runner = ExampleRunner(self.get_suite(), shard_index=shard_index, shard_count=2)
+            test_runner.timings = timings
+            shard_test_ids = get_test_ids(test_runner.build_suite())
+
+            # Both shards get work, and a feature's tests stay together.
+            self.assertTrue(shard_test_ids)
+            self.assertEqual(shard_test_ids, get_test_ids(self.get_suite(), test_runner.is_in_shard))
+            test_ids.extend(shard_test_ids)
+
+        self.assertEqual(sorted(test_ids), get_test_ids(self.get_suite()))
+
+    def test_unimplemented_features_checked_in_same_shard(self):
+        # A feature without a test case is sharded by key alone.
+        untested_key = get_file_key(self.create_feature('untested.feature'))
+
+        feature_index = discovery.FeatureIndex([self.directory], feature_cache=FeatureCache())
+        self.addCleanup(setattr, discovery, '_feature_index', discovery._feature_index)
+        discovery._feature_index = feature_index
+
+        for timings in (None, scheduling.Timings()):
+            for shard_index in range(2):
+                test_runner = ExampleRunner(self.get_suite(), shard_index=shard_index, shard_count=2)
+                test_runner.timings = timings
+                tested_keys = set(
+                    scheduling.get_test_key(test)
+                    for test in scheduling.iter_tests(test_runner.build_suite())
+                )
+
+                # Nothing has run, so every feature in the shard is reported.
+                test_runner.journal = journal.MemoryJournal()
+                try:
+                    runner.UnimplementedBDDTestCase(runner=test_runner).test_unimplemented_feature()
+                    unimplemented = ''
+                except UnimplementedScenariosError as exc:
+                    unimplemented = str(exc)
+
+                for feature_filename in self.feature_filenames:
+                    key = get_file_key(feature_filename)
+                    self.assertEqual(key in unimplemented, key in tested_keys)
+
+                self.assertEqual(untested_key in unimplemented, test_runner.is_in_shard(untested_key))
+
+class ChangedSinceTestCase(RunnerTestCase):
+    def test_only_dependent_scenarios_run(self):
+        handlers_filename = os.path.join(self.directory, 'handlers.py')
+        with open(handlers_filename, 'w') as fp:
+            fp.write('# Step handlers\n')
+
+        # Only the first four features' scenarios use the handler module, and
+        # the last feature's have never passed.
+        dependency_map = dependencies.DependencyMap()
+        for index, feature_filename in enumerate(self.feature_filenames[:7]):
+            file_keys = [get_file_key(feature_filename)]
+            if index < 4:
+                file_keys.append(get_file_key(handlers_filename))
+            for test in unittest.TestLoader().loadTestsFromTestCase(self.test_cases[index]):
+                dependency_map.record(test.id(), get_file_key(feature_filename), test._testMethodName, file_keys)
+        map_filename = os.path.join(self.directory, 'dependencies.json')
+        dependency_map.save(map_filename)
+
+        with open(handlers_filename, 'w') as fp:
+            fp.write('# Changed step handlers\n')
+
+        test_runner = ExampleRunner(self.get_suite())
+        test_runner.dependency_map = dependencies.DependencyMap.load(map_filename)
+        suite = test_runner.build_suite()
+
+        changed_keys = set(
+            get_file_key(feature_filename)
+            for feature_filename in self.feature_filenames[:4] + self.feature_filenames[7:]
+        )
+        self.assertEqual(get_test_ids(suite), get_test_ids(
+            self.get_suite(),
+            lambda key: key in changed_keys or key == 'tests.test_runner.ExampleTestCase'
+        ))
+
+        # Scenarios skipped as unchanged still count as implemented.
+        test_runner.journal = journal.MemoryJournal()
+        implemented_scenarios = test_runner.get_implemented_scenarios()
+        for index, feature_filename in enumerate(self.feature_filenames):
+            self.assertEqual(
+                implemented_scenarios[os.path.abspath(feature_filename)],
+                set(
+                    test._testMethodName
+                    for test in unittest.TestLoader().loadTestsFromTestCase(self.test_cases[index])
+                ) if 4 <= index < 7 else set()
+            )
+
+@unittest.skipIf(runner.ParallelTestSuite is None, 'Django < 1.9 has no parallel test suite')
+class ParallelTestCase(RunnerTestCase):
+    def get_suite(self):
+        return runner.ParallelTestSuite(super(ParallelTestCase, self).get_suite(), 2)
+
+    def test_unimplemented_check_run_serially(self):
+        suite = ExampleRunner(self.get_suite()).build_suite()
+
+        self.assertEqual(
+            [type(test) for test in suite.serial_tests],
+            [runner.UnimplementedBDDTestCase]
+        )
+        self.assertFalse(any(
+            isinstance(test, runner.UnimplementedBDDTestCase)
+            for subsuite in suite.subsuites
+            for test in scheduling.iter_tests(subsuite)
+        ))
+        self.assertIs(list(suite)[-1], suite.serial_tests[0])
+
+        # Only a full run checks for unimplemented scenarios.
+        labelled_suite = ExampleRunner(self.get_suite()).build_suite(['tests'])
+        self.assertEqual(labelled_suite.serial_tests, [])
+
+    def test_longest_subsuites_first(self):
+        # Each feature's scenarios all take this long; features have 1 to 3.
+        scenario_durations = [3.0, 1.0, 8.0, 4.0, 5.0, 2.0, 7.0, 6.0]
+        test_runner = ExampleRunner(self.get_suite())
+        test_runner.timings = scheduling.Timings(dict(
+            (
+                get_file_key(feature_filename),
+                dict(('Scenario {}'.format(index), duration) for index in range(3))
+            )
+            for feature_filename, duration in zip(self.feature_filenames, scenario_durations)
+        ))
+        suite = test_runner.build_suite()
+
+        # The unit tests, without timings, take the median scenario duration.
+        feature_keys = [get_file_key(feature_filename) for feature_filename in self.feature_filenames]
+        self.assertEqual(
+            [scheduling.get_test_key(next(scheduling.iter_tests(subsuite))) for subsuite in suite.subsuites],
+            [
+                feature_keys[2],  # 3 * 8.0
+                feature_keys[7],  # 2 * 6.0
+                feature_keys[4],  # 2 * 5.0
+                feature_keys[6],  # 1 * 7.0
+                feature_keys[5],  # 3 * 2.0
+                'tests.test_runner.ExampleTestCase',  # 5.0
+                feature_keys[3],  # 1 * 4.0
+                feature_keys[0],  # 1 * 3.0
+                feature_keys[1]  # 2 * 1.0
+            ]
+        )
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from swanson.test import scheduling
+from swanson.test.case import TestCaseMixin
+
+class ExampleTestCase(unittest.TestCase):
+    def test_a(self):
+        pass
+
+    def test_b(self):
+        pass
+
+class ExampleBDDTestCase(TestCaseMixin, unittest.TestCase):
+    def test_a(self):
+        pass
+
+class ShardingTestCase(unittest.TestCase):
+    def test_shard_index_is_stable(self):
+        self.assertEqual(scheduling.get_shard_index('app/tests/example.feature', 16), 10)
+
+    def test_shards_cover_every_key(self):
+        keys = ['feature{}.feature'.format(index) for index in range(100)]
+        shard_indexes = [scheduling.get_shard_index(key, 4) for key in keys]
+        self.assertEqual(set(shard_indexes), set(range(4)))
+
+    def test_test_key(self):
+        self.assertEqual(
+            scheduling.get_test_key(ExampleTestCase('test_a')),
+            'tests.test_scheduling.ExampleTestCase'
+        )
+
+        self.assertEqual(
+            scheduling.get_test_key(ExampleBDDTestCase('test_a')),
+            'tests/scheduling.feature'
+        )
+
+class FilterSuiteTestCase(unittest.TestCase):
+    def test_filter_nested_suite(self):
+        suite = unittest.TestSuite([
+            unittest.TestSuite([ExampleTestCase('test_a'), ExampleTestCase('test_b')]),
+            ExampleBDDTestCase('test_a')
+        ])
+
+        filtered = scheduling.filter_suite(suite, lambda test: test._testMethodName == 'test_a')
+
+        self.assertEqual(
+            [test.id() for test in filtered],
+            [
+                'tests.test_scheduling.ExampleTestCase.test_a',
+                'tests.test_scheduling.ExampleBDDTestCase.test_a'
+            ]
+        )
+
+class PackTestCase(unittest.TestCase):
+    def test_longest_first(self):
+        self.assertEqual(
+            scheduling.pack({'a': 5.0, 'b': 4.0, 'c': 3.0, 'd': 3.0, 'e': 1.0}, 2),
+            {'a': 0, 'b': 1, 'c': 1, 'd': 0, 'e': 1}
+        )
+
+    def test_more_bins_than_keys(self):
+        self.assertEqual(scheduling.pack({'a': 1.0}, 3), {'a': 0})
+
+class TimingsTestCase(unittest.TestCase):
+    def test_estimate(self):
+        timings = scheduling.Timings({
+            'a.feature': {'First': 1.0, 'Second': 2.0},
+            'b.feature': {'First': 10.0}
+        })
+
+        self.assertEqual(timings.get_default_duration(), 2.0)
+        self.assertEqual(timings.estimate('a.feature', 2), 3.0)
+        self.assertEqual(timings.estimate('a.feature', 3), 5.0)
+        self.assertEqual(timings.estimate('a.feature', 1), 2.0)
+        self.assertEqual(timings.estimate('c.feature', 2, default_duration=0.5), 1.0)
+
+    def test_default_duration_without_history(self):
+        self.assertEqual(scheduling.Timings().get_default_duration(), scheduling.DEFAULT_DURATION)
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, 'timings.json')
+
+        timings = scheduling.Timings.load(filename)
+        timings.record('a.feature', 'First', 1.5)
+        timings.save(filename)
+
+        timings = scheduling.Timings.load(filename)
+        timings.record('a.feature', 'Second', 0.5)
+        timings.save(filename)
+
+        self.assertEqual(scheduling.Timings.load(filename).estimate('a.feature', 2), 2.0)
@@ -0,0 +1,89 @@
+import unittest
+
+from swanson.data import Feature
+from swanson.decorators import given, then, when
+from swanson.parsing import parse_lines
+from swanson.test.case import TestCaseMixin
+from swanson.test.step_coverage import StepCoverage
+
+FEATURE = Feature(parse_lines(u"""
+Feature: Example
+    Scenario: Handled
+        Given I have 8 apples
+        When I eat 2 apples
+
+    Scenario Outline: Partly handled
+        Given I have <count> apples
+        When I eat 1 apples
+        Then something undefined
+
+        Examples:
+            | count |
+            | 1     |
+            | 2     |
+""".split('\n')), 'example.feature')
+
+class ExampleTestCase(TestCaseMixin, unittest.TestCase):
+    @given(r'^I have (\d+) apples$')
+    def given_apples(self, step, count):
+        pass
+
+    @when(r'^I eat (\d+) apples$')
+    def when_eat(self, step, count):
+        pass
+
+    @when(r'^I eat 1 apples$')
+    def when_eat_one(self, step):
+        pass
+
+    @then(r'^never used$')
+    def then_unused(self, step):
+        pass
+
+    def run_test(self):
+        pass
+
+class StepCoverageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.coverage = StepCoverage()
+        self.coverage.add_test_case(ExampleTestCase('run_test'), FEATURE)
+
+    def test_counts(self):
+        self.assertEqual(self.coverage.step_count, 8)
+        self.assertEqual(self.coverage.handler_count, 4)
+
+    def test_undefined(self):
+        self.assertEqual(self.coverage.undefined, [{
+            'test_case': 'tests.test_step_coverage.ExampleTestCase',
+            'feature_filename': 'example.feature',
+            'line': 10,
+            'step': 'Then something undefined'
+        }])
+
+    def test_ambiguous(self):
+        self.assertEqual(len(self.coverage.ambiguous), 1)
+        record = self.coverage.ambiguous[0]
+        self.assertEqual(record['step'], 'When I eat 1 apples')
+        self.assertEqual(
+            [handler['handler'].rsplit('.', 1)[-1] for handler in record['handlers']],
+            ['when_eat', 'when_eat_one']
+        )
+
+    def test_unused(self):
+        self.assertEqual(
+            [handler['handler'].rsplit('.', 1)[-1] for handler in self.coverage.get_unused_handlers()],
+            ['then_unused']
+        )
+        self.assertEqual(self.coverage.get_unused_handlers()[0]['patterns'], ['^never used$'])
+
+    def test_shared_handlers(self):
+        # A second test case with the same handlers reuses the matches.
+        self.coverage.add_test_case(ExampleTestCase('run_test'), FEATURE)
+        self.assertEqual(self.coverage.step_count, 16)
+        self.assertEqual(len(self.coverage._handler_matches), 1)
+        self.assertEqual(len(self.coverage.undefined), 2)
+
+    def test_report(self):
+        report = self.coverage.format_report()
+        self.assertIn('Matched 8 steps against 4 step handlers: 1 undefined, 1 ambiguous, 1 handlers unused', report)
+        self.assertIn("'Then something undefined' on line 10 of example.feature", report)